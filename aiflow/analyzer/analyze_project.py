@@ -7,6 +7,8 @@ AIFlow 项目分析器 v2.0 - 真正的代码结构分析
 import sys
 import io
 import json
+import time
+import argparse
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -18,14 +20,18 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 from code_parser import CodeParser, ClassInfo, MethodInfo
+from parse_cache import ParseCache
 
 
 class ProjectAnalyzer:
     """项目分析器"""
 
-    def __init__(self, project_path: str, project_name: Optional[str] = None):
+    def __init__(self, project_path: str, project_name: Optional[str] = None, workers: int = 1,
+                 cache_path: Optional[str] = None):
         self.project_path = Path(project_path)
         self.project_name = project_name or self.project_path.name
+        self.workers = workers  # 并行解析进程数（1 为单进程，0 为全部 CPU）
+        self.cache_path = cache_path  # 解析缓存 SQLite 文件（None 为不使用缓存）
 
         self.parser = CodeParser()
 
@@ -57,8 +63,18 @@ class ProjectAnalyzer:
 
         # 1. 解析代码
         print("⏳ 解析代码文件...")
-        self.classes, self.methods = self.parser.parse_project(self.project_path)
+        cache = ParseCache(Path(self.cache_path)) if self.cache_path else None
+        try:
+            self.classes, self.methods = self.parser.parse_project(
+                self.project_path, workers=self.workers, cache=cache
+            )
+        finally:
+            if cache is not None:
+                cache.close()
         print(f"✅ 找到 {len(self.classes)} 个类，{len(self.methods)} 个方法")
+        if cache is not None:
+            stats = cache.get_stats()
+            print(f"   缓存命中 {stats['hits']} 个文件，重新解析 {stats['misses']} 个文件")
         print()
 
         # 2. 构建代码结构图
@@ -148,9 +164,12 @@ class ProjectAnalyzer:
                 })
 
         # 3. 创建类节点（组件级）
+        # 先为全部类分配节点，继承/接口关系不再依赖类的遍历顺序
+        class_node_ids = []
         for cls in self.classes:
             class_node_id = self._gen_node_id()
             self.class_to_node_id[cls.name] = class_node_id
+            class_node_ids.append(class_node_id)
 
             self.nodes.append({
                 "id": class_node_id,
@@ -160,6 +179,7 @@ class ProjectAnalyzer:
                 "file_path": cls.file_path
             })
 
+        for cls, class_node_id in zip(self.classes, class_node_ids):
             # 类属于模块
             package = cls.package or "default"
             if package in package_to_node_id:
@@ -193,10 +213,13 @@ class ProjectAnalyzer:
                     })
 
         # 4. 创建方法节点（函数级）
+        # 方法名 -> 候选方法键（按解析顺序），用于跨类调用解析
+        method_candidates: Dict[str, List[str]] = defaultdict(list)
         for method in self.methods:
             method_key = f"{method.class_name}.{method.name}"
             method_node_id = self._gen_node_id()
             self.method_to_node_id[method_key] = method_node_id
+            method_candidates[method.name].append(method_key)
 
             self.nodes.append({
                 "id": method_node_id,
@@ -226,18 +249,7 @@ class ProjectAnalyzer:
                 continue
 
             for called_method in method.calls:
-                # 尝试在当前类中查找
-                target_key = f"{method.class_name}.{called_method}"
-                target_id = self.method_to_node_id.get(target_key)
-
-                # 如果找不到，尝试在所有类中查找
-                if not target_id:
-                    for other_method in self.methods:
-                        if other_method.name == called_method:
-                            target_key = f"{other_method.class_name}.{other_method.name}"
-                            target_id = self.method_to_node_id.get(target_key)
-                            if target_id:
-                                break
+                target_id = self._resolve_call(method.class_name, called_method, method_candidates)
 
                 if target_id and source_id != target_id:
                     self.edges.append({
@@ -247,6 +259,19 @@ class ProjectAnalyzer:
                         "type": "calls"
                     })
 
+    def _resolve_call(self, class_name: str, called_method: str,
+                      method_candidates: Dict[str, List[str]]) -> Optional[str]:
+        """解析调用目标：优先当前类，其次按解析顺序的第一个同名方法"""
+        target_id = self.method_to_node_id.get(f"{class_name}.{called_method}")
+        if target_id:
+            return target_id
+
+        for candidate_key in method_candidates.get(called_method, ()):
+            target_id = self.method_to_node_id.get(candidate_key)
+            if target_id:
+                return target_id
+        return None
+
     def _generate_launch_buttons(self):
         """生成启动按钮"""
         # 为每个包生成一个 macro 按钮
@@ -327,15 +352,66 @@ class ProjectAnalyzer:
         return f"unit_{self.unit_id_counter}"
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("用法: python analyze_project.py <项目路径> [项目名称]")
-        sys.exit(1)
+def benchmark_call_resolution(num_methods: int = 50000, calls_per_method: int = 4) -> List[Dict]:
+    """
+    合成项目基准：分别以 1/4、1/2、全部方法数构建代码结构，验证调用解析近似线性
+
+    每个类 10 个方法，每个方法调用其他类的方法和一个不存在的方法。
+
+    Args:
+        num_methods: 最大方法数（默认 50000）
+        calls_per_method: 每个方法的跨类调用数
+
+    Returns:
+        List[Dict]: 每个规模的方法数、边数和耗时
+    """
+    results = []
+    for size in (num_methods // 4, num_methods // 2, num_methods):
+        num_classes = max(1, size // 10)
+        analyzer = ProjectAnalyzer("/bench", "bench")
+        analyzer.classes = [
+            ClassInfo(name=f"C{c}", file_path=f"C{c}.java", package=f"pkg{c % 50}",
+                      superclass=f"C{c + 1}" if c + 1 < num_classes else None)
+            for c in range(num_classes)
+        ]
+        analyzer.methods = [
+            MethodInfo(
+                name=f"m{i % (size // 2 or 1)}", class_name=f"C{i // 10}", file_path=f"C{i // 10}.java",
+                calls={f"m{(i * 7 + k * 131) % (size // 2 or 1)}" for k in range(calls_per_method)} | {"missing"}
+            )
+            for i in range(size)
+        ]
+
+        start = time.perf_counter()
+        analyzer._build_code_structure()
+        elapsed = time.perf_counter() - start
+        results.append({"methods": size, "edges": len(analyzer.edges), "seconds": elapsed})
+
+    return results
 
-    project_path = sys.argv[1]
-    project_name = sys.argv[2] if len(sys.argv) > 2 else None
 
-    analyzer = ProjectAnalyzer(project_path, project_name)
+def main():
+    parser = argparse.ArgumentParser(usage="python analyze_project.py <项目路径> [项目名称] [-j N] [--cache FILE]")
+    parser.add_argument("project_path", nargs="?")
+    parser.add_argument("project_name", nargs="?")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="并行解析进程数（默认 1，0 表示使用全部 CPU）")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="解析缓存文件（SQLite），未变更的文件直接复用上次结果")
+    parser.add_argument("--benchmark", metavar="N", type=int,
+                        help="运行 N 个方法的合成调用解析基准，不分析项目")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for row in benchmark_call_resolution(args.benchmark):
+            print(f"方法 {row['methods']:>7}  边 {row['edges']:>8}  "
+                  f"耗时 {row['seconds']:.3f}s  ({row['seconds'] / row['methods'] * 1e6:.1f}µs/方法)")
+        return
+    if not args.project_path:
+        parser.error("缺少项目路径")
+
+    analyzer = ProjectAnalyzer(args.project_path, args.project_name, workers=args.workers,
+                               cache_path=args.cache)
     result = analyzer.analyze()
 
     # 输出 JSON
@@ -5,11 +5,16 @@ AIFlow 代码解析器 - 真正的AST级别分析
 支持 Java, Kotlin, Python, JavaScript, TypeScript
 """
 
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 
+# 解析器版本：修改解析逻辑或 ClassInfo/MethodInfo 结构时递增，使解析缓存失效
+PARSER_VERSION = "1"
+
 
 @dataclass
 class ClassInfo:
@@ -314,30 +319,86 @@ class PythonParser:
 class CodeParser:
     """统一代码解析器"""
 
+    # 支持的文件类型
+    EXTENSIONS = {'.java', '.kt', '.py'}
+
     def __init__(self):
         self.java_kotlin_parser = JavaKotlinParser()
         self.python_parser = PythonParser()
 
-    def parse_project(self, project_path: Path) -> Tuple[List[ClassInfo], List[MethodInfo]]:
-        """解析整个项目"""
-        all_classes = []
-        all_methods = []
-
-        # 支持的文件类型
-        extensions = {'.java', '.kt', '.py'}
-
-        for file_path in project_path.rglob('*'):
-            if file_path.suffix not in extensions:
-                continue
+    def parse_file(self, file_path: Path) -> Tuple[List[ClassInfo], List[MethodInfo]]:
+        """按扩展名解析单个文件"""
+        if file_path.suffix in {'.java', '.kt'}:
+            return self.java_kotlin_parser.parse_file(file_path)
+        elif file_path.suffix == '.py':
+            return self.python_parser.parse_file(file_path)
+        return [], []
+
+    def collect_files(self, project_path: Path) -> List[Path]:
+        """收集待解析文件（排序，保证结果顺序确定）"""
+        return sorted(
+            p for p in project_path.rglob('*')
+            if p.suffix in self.EXTENSIONS and p.is_file()
+        )
 
-            if file_path.suffix in {'.java', '.kt'}:
-                classes, methods = self.java_kotlin_parser.parse_file(file_path)
-            elif file_path.suffix == '.py':
-                classes, methods = self.python_parser.parse_file(file_path)
+    def parse_project(self, project_path: Path, workers: int = 1,
+                      chunk_size: int = 64, cache=None) -> Tuple[List[ClassInfo], List[MethodInfo]]:
+        """
+        解析整个项目
+
+        workers > 1 时按 chunk_size 分块交给进程池并行解析，
+        结果按文件路径顺序合并，与 worker 数量无关。
+        workers <= 0 表示使用全部 CPU。
+        cache 为 ParseCache 时只解析未命中的文件，并写回缓存。
+        """
+        files = self.collect_files(project_path)
+
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+
+        results: List[Optional[Tuple[List[ClassInfo], List[MethodInfo]]]] = [None] * len(files)
+        pending = []
+        for i, f in enumerate(files):
+            cached = cache.get(f) if cache is not None else None
+            if cached is None:
+                pending.append(i)
             else:
-                continue
+                results[i] = cached
+
+        pending_files = [files[i] for i in pending]
+        if workers == 1 or len(pending_files) <= chunk_size:
+            parsed = [self.parse_file(f) for f in pending_files]
+        else:
+            chunks = [pending_files[i:i + chunk_size] for i in range(0, len(pending_files), chunk_size)]
+            parsed = []
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map 按提交顺序返回，保证合并顺序确定
+                for chunk_results in executor.map(_parse_files_chunk, chunks):
+                    parsed.extend(chunk_results)
+
+        for i, result in zip(pending, parsed):
+            results[i] = result
+            if cache is not None:
+                cache.put(files[i], result)
+        if cache is not None:
+            cache.commit()
 
+        all_classes = []
+        all_methods = []
+        for classes, methods in results:
             all_classes.extend(classes)
             all_methods.extend(methods)
 
         return all_classes, all_methods
+
+
+# 进程池 worker 内复用的解析器
+_worker_parser: Optional[CodeParser] = None
+
+
+def _parse_files_chunk(files: List[Path]) -> List[Tuple[List[ClassInfo], List[MethodInfo]]]:
+    """进程池 worker：解析一批文件"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CodeParser()
+    return [_worker_parser.parse_file(f) for f in files]
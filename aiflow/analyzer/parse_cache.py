@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AIFlow 解析缓存 - 按文件缓存 ClassInfo/MethodInfo (SQLite)
+
+命中规则: 路径 + mtime + size 一致直接命中；否则比较内容哈希，
+一致则刷新 mtime 后命中。PARSER_VERSION 变化时整个缓存失效。
+"""
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from code_parser import PARSER_VERSION, ClassInfo, MethodInfo
+
+ParseResult = Tuple[List[ClassInfo], List[MethodInfo]]
+
+
+def _hash_file(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dump(result: ParseResult) -> str:
+    classes, methods = result
+    method_dicts = []
+    for m in methods:
+        d = asdict(m)
+        d['calls'] = sorted(m.calls)
+        method_dicts.append(d)
+    return json.dumps({'classes': [asdict(c) for c in classes], 'methods': method_dicts},
+                      ensure_ascii=False)
+
+
+def _load(payload: str) -> ParseResult:
+    data = json.loads(payload)
+    classes = [ClassInfo(**c) for c in data['classes']]
+    methods = []
+    for m in data['methods']:
+        m['calls'] = set(m['calls'])
+        methods.append(MethodInfo(**m))
+    return classes, methods
+
+
+class ParseCache:
+    """按文件的持久化解析缓存"""
+
+    def __init__(self, db_path: Path, parser_version: str = PARSER_VERSION):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.parser_version = parser_version
+
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, '
+            'content_hash TEXT, payload TEXT)'
+        )
+
+        # 解析器版本变化：清空旧条目
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'parser_version'").fetchone()
+        if row is None or row[0] != parser_version:
+            self.conn.execute('DELETE FROM files')
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('parser_version', ?)",
+                (parser_version,)
+            )
+        self.conn.commit()
+
+    def get(self, file_path: Path) -> Optional[ParseResult]:
+        """读取缓存，未命中返回 None"""
+        key = str(file_path.resolve())
+        row = self.conn.execute(
+            'SELECT mtime_ns, size, content_hash, payload FROM files WHERE path = ?', (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        mtime_ns, size, content_hash, payload = row
+        try:
+            stat = file_path.stat()
+        except OSError:
+            self.misses += 1
+            return None
+
+        if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+            # mtime/size 变化：内容哈希兜底（如 git checkout 只改了 mtime）
+            if stat.st_size != size or _hash_file(file_path) != content_hash:
+                self.misses += 1
+                return None
+            self.conn.execute('UPDATE files SET mtime_ns = ? WHERE path = ?',
+                              (stat.st_mtime_ns, key))
+
+        self.hits += 1
+        return _load(payload)
+
+    def put(self, file_path: Path, result: ParseResult) -> None:
+        """写入缓存"""
+        try:
+            stat = file_path.stat()
+            content_hash = _hash_file(file_path)
+        except OSError:
+            return
+
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash, payload) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size, content_hash, _dump(result))
+        )
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -12,14 +12,25 @@ from .protocol.entities import *
 from .protocol.validator import ProtocolValidator, validate_analysis_result
 from .protocol.serializer import ProtocolSerializer, serialize_to_file, deserialize_from_file
 
-from .adapters.base import BaseAIAdapter, AIProvider, AIModelConfig, AIResponse, TokenUsage
+from .adapters.base import (
+    BaseAIAdapter,
+    AIProvider,
+    AIModelConfig,
+    AIResponse,
+    TokenUsage,
+    BatchRequest,
+    BatchResult,
+)
 from .adapters.claude import ClaudeAdapter, create_claude_adapter
+from .adapters.client_pool import ClientPool, get_client_pool, close_client_pool
 
 from .prompts.manager import PromptTemplateManager, load_prompt_template
-from .prompts.renderer import PromptRenderer, render_prompt
+from .prompts.renderer import PromptRenderer, RenderedPrompt, render_prompt
 
 from .analysis.engine import AnalysisEngine, AnalysisJob, AnalysisStage, AnalysisStatus
-from .analysis.queue import TaskQueue, TaskPriority, get_global_queue
+from .analysis.queue import TaskEvictedError, TaskPriority, TaskQueue, get_global_queue
+from .analysis.cache import StageResultCache, compute_project_hash
+from .analysis.streaming import IncrementalJSONParser, StreamingJSONError
 
 __all__ = [
     # Version
@@ -39,13 +50,19 @@ __all__ = [
     "AIModelConfig",
     "AIResponse",
     "TokenUsage",
+    "BatchRequest",
+    "BatchResult",
     "ClaudeAdapter",
     "create_claude_adapter",
+    "ClientPool",
+    "get_client_pool",
+    "close_client_pool",
 
     # Prompts
     "PromptTemplateManager",
     "load_prompt_template",
     "PromptRenderer",
+    "RenderedPrompt",
     "render_prompt",
 
     # Analysis
@@ -55,5 +72,10 @@ __all__ = [
     "AnalysisStatus",
     "TaskQueue",
     "TaskPriority",
+    "TaskEvictedError",
     "get_global_queue",
+    "StageResultCache",
+    "compute_project_hash",
+    "IncrementalJSONParser",
+    "StreamingJSONError",
 ]
@@ -7,15 +7,26 @@ AI 适配器基础接口 - 统一的 AI 模型调用抽象层
 2. 支持多种 AI 模型 (Claude, GPT-4, Gemini, etc.)
 3. 流式响应支持
 4. Token 使用统计
-5. 错误处理和重试机制
+5. 错误处理和重试机制 (共享 RPM/TPM 限流 + 全抖动退避)
+6. 可缓存的共享上下文块 (提示词前缀缓存)
+7. 批量生成 (离线批处理 API)
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
+from .rate_limiter import (
+    RateLimiter,
+    estimate_tokens,
+    full_jitter_backoff,
+    get_rate_limiter,
+    rate_limiter_key,
+)
+
 
 class AIProvider(Enum):
     """AI 提供商枚举"""
@@ -36,7 +47,19 @@ class AIModelConfig:
     temperature: float = 0.7
     timeout: int = 120  # 秒
     max_retries: int = 3
-    retry_delay: float = 1.0  # 秒
+    retry_delay: float = 1.0  # 秒 (全抖动退避的基础延迟)
+    max_retry_delay: float = 60.0  # 秒 (退避上限)
+    requests_per_minute: Optional[int] = None  # 客户端 RPM 限额 (None 表示只按响应头限流)
+    tokens_per_minute: Optional[int] = None  # 客户端 TPM 限额 (None 表示只按响应头限流)
+    max_concurrent_requests: Optional[int] = None  # 同一账号/模型的最大并发请求数
+    shared_client: bool = True  # 同一账号/端点的适配器实例共享 HTTP 客户端 (连接池)
+    max_connections: int = 100  # 连接池最大连接数
+    max_keepalive_connections: int = 20  # 连接池最大空闲 keep-alive 连接数
+    keepalive_expiry: float = 30.0  # 秒 (空闲连接保持时间)
+    http2: bool = True  # 启用 HTTP/2 (需要安装 h2)
+    prompt_caching: bool = True  # 共享上下文块使用提供商的提示词缓存
+    batch_poll_interval: float = 30.0  # 秒 (批处理状态轮询间隔)
+    batch_timeout: float = 86400.0  # 秒 (批处理最长等待时间，超时后取消)
     extra_params: Optional[Dict[str, Any]] = None
 
 
@@ -46,6 +69,8 @@ class TokenUsage:
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
+    cache_creation_tokens: int = 0  # 写入提示词缓存的输入 Token 数 (包含在 prompt_tokens 中)
+    cache_read_tokens: int = 0  # 命中提示词缓存的输入 Token 数 (包含在 prompt_tokens 中)
 
     @property
     def cost_estimate(self) -> float:
@@ -53,8 +78,13 @@ class TokenUsage:
         成本估算（美元）
         注: 实际成本需要根据具体模型定价计算
         """
-        # 粗略估算: $0.01 / 1K tokens
-        return self.total_tokens * 0.01 / 1000
+        # 粗略估算: $0.01 / 1K tokens，缓存写入按 1.25 倍、缓存命中按 0.1 倍计
+        billed_tokens = (
+            self.total_tokens
+            + 0.25 * self.cache_creation_tokens
+            - 0.9 * self.cache_read_tokens
+        )
+        return billed_tokens * 0.01 / 1000
 
 
 @dataclass
@@ -69,6 +99,26 @@ class AIResponse:
     metadata: Optional[Dict[str, Any]] = None
 
 
+@dataclass
+class BatchRequest:
+    """批量生成中的单个请求 (参数含义同 generate())"""
+    custom_id: str  # 请求 ID (批内唯一，仅限字母、数字、_ 和 -，最长 64)
+    prompt: str
+    system_prompt: Optional[str] = None
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stop_sequences: Optional[List[str]] = None
+    context_blocks: Optional[List[str]] = None
+
+
+@dataclass
+class BatchResult:
+    """批量生成中的单个结果"""
+    custom_id: str
+    response: Optional[AIResponse] = None
+    error: Optional[str] = None  # 失败原因 (response 为 None 时)
+
+
 class AIAdapterError(Exception):
     """AI 适配器错误基类"""
     pass
@@ -76,7 +126,15 @@ class AIAdapterError(Exception):
 
 class RateLimitError(AIAdapterError):
     """速率限制错误"""
-    pass
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        """
+        Args:
+            message: 错误信息
+            retry_after: 服务端要求的等待时间(秒) (可选)
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class AuthenticationError(AIAdapterError):
@@ -111,6 +169,16 @@ class BaseAIAdapter(ABC):
         self.config = config
         self._validate_config()
 
+        # 同一账号/端点/模型的所有适配器实例共享一个限流器
+        self.rate_limiter: RateLimiter = get_rate_limiter(
+            rate_limiter_key(
+                config.provider.value, config.api_key, config.api_base_url, config.model_name
+            ),
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_concurrent=config.max_concurrent_requests,
+        )
+
     def _validate_config(self) -> None:
         """验证配置"""
         if not self.config.api_key:
@@ -130,6 +198,7 @@ class BaseAIAdapter(ABC):
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
         **kwargs: Any
     ) -> AIResponse:
         """
@@ -141,6 +210,7 @@ class BaseAIAdapter(ABC):
             max_tokens: 最大生成 Token 数 (可选，使用配置默认值)
             temperature: 温度参数 (可选，使用配置默认值)
             stop_sequences: 停止序列 (可选)
+            context_blocks: 共享上下文块 (可选，放在 prompt 之前，支持时使用提示词缓存)
             **kwargs: 额外参数
 
         Returns:
@@ -152,13 +222,14 @@ class BaseAIAdapter(ABC):
         pass
 
     @abstractmethod
-    async def generate_stream(
+    def generate_stream(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
         **kwargs: Any
     ) -> AsyncIterator[str]:
         """
@@ -170,6 +241,7 @@ class BaseAIAdapter(ABC):
             max_tokens: 最大生成 Token 数 (可选)
             temperature: 温度参数 (可选)
             stop_sequences: 停止序列 (可选)
+            context_blocks: 共享上下文块 (可选，放在 prompt 之前，支持时使用提示词缓存)
             **kwargs: 额外参数
 
         Yields:
@@ -200,6 +272,39 @@ class BaseAIAdapter(ABC):
         """
         pass
 
+    async def generate_batch(self, requests: List[BatchRequest]) -> List[BatchResult]:
+        """
+        批量生成（离线，不要求交互延迟）
+
+        默认实现经过共享限流器并发调用 generate_with_retry()；
+        提供批处理 API 的适配器应覆盖此方法 (通常成本更低、吞吐更高)。
+
+        Args:
+            requests: 请求列表
+
+        Returns:
+            List[BatchResult]: 与 requests 顺序一致的结果 (单个请求失败不影响其他请求)
+        """
+        async def run(request: BatchRequest) -> BatchResult:
+            try:
+                response = await self.generate_with_retry(
+                    prompt=request.prompt,
+                    system_prompt=request.system_prompt,
+                    max_tokens=request.max_tokens,
+                    temperature=request.temperature,
+                    stop_sequences=request.stop_sequences,
+                    context_blocks=request.context_blocks,
+                )
+                return BatchResult(custom_id=request.custom_id, response=response)
+            except AIAdapterError as e:
+                return BatchResult(custom_id=request.custom_id, error=str(e))
+
+        return list(await asyncio.gather(*(run(request) for request in requests)))
+
+    async def close(self) -> None:
+        """释放适配器持有的资源 (默认无操作)"""
+        return None
+
     def get_provider(self) -> AIProvider:
         """获取提供商"""
         return self.config.provider
@@ -215,11 +320,16 @@ class BaseAIAdapter(ABC):
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
         **kwargs: Any
     ) -> AIResponse:
         """
         带重试的生成
 
+        每次调用前向共享限流器预留 1 个请求和预估的 Token 数 (输入 + 最大输出)，
+        返回后按实际用量校正。失败时全抖动指数退避；速率限制错误带 retry-after 时
+        暂停共享限流器，所有并发请求一起等待，避免同时重试。
+
         Args:
             同 generate()
 
@@ -229,36 +339,41 @@ class BaseAIAdapter(ABC):
         Raises:
             AIAdapterError: 重试耗尽后仍失败
         """
-        import asyncio
-
         last_error: Optional[Exception] = None
+        estimated_tokens = (
+            self._estimate_input_tokens(prompt, system_prompt, context_blocks)
+            + (max_tokens or self.config.max_tokens)
+        )
 
         for attempt in range(self.config.max_retries):
             try:
-                return await self.generate(
+                return await self._generate_limited(
+                    estimated_tokens,
                     prompt,
                     system_prompt,
                     max_tokens,
                     temperature,
                     stop_sequences,
+                    context_blocks,
                     **kwargs
                 )
             except RateLimitError as e:
-                # 速率限制：指数退避
+                # 速率限制：按 retry-after 暂停所有请求 + 全抖动退避
                 last_error = e
+                if e.retry_after:
+                    self.rate_limiter.pause(e.retry_after)
                 if attempt < self.config.max_retries - 1:
-                    delay = self.config.retry_delay * (2 ** attempt)
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(self._get_retry_delay(attempt))
                     continue
                 raise
             except (AuthenticationError, InvalidRequestError, ModelNotFoundError):
                 # 这些错误不应重试
                 raise
             except AIAdapterError as e:
-                # 其他错误：重试
+                # 其他错误：全抖动退避后重试
                 last_error = e
                 if attempt < self.config.max_retries - 1:
-                    await asyncio.sleep(self.config.retry_delay)
+                    await asyncio.sleep(self._get_retry_delay(attempt))
                     continue
                 raise
 
@@ -267,6 +382,111 @@ class BaseAIAdapter(ABC):
             f"Failed after {self.config.max_retries} retries"
         ) from last_error
 
+    async def _generate_limited(
+        self,
+        estimated_tokens: int,
+        *args: Any,
+        **kwargs: Any
+    ) -> AIResponse:
+        """经过共享限流器调用 generate()，结束后按实际用量校正预留 (内部使用)"""
+        reservation = await self.rate_limiter.acquire(estimated_tokens)
+        used_tokens: Optional[int] = None
+        try:
+            response = await self.generate(*args, **kwargs)
+            used_tokens = response.usage.total_tokens
+            return response
+        finally:
+            self.rate_limiter.release(reservation, used_tokens)
+
+    async def generate_stream_limited(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> AsyncGenerator[str, None]:
+        """
+        经过共享限流器的流式生成
+
+        收到第一个片段之前失败时，与 generate_with_retry 一样全抖动退避后重试
+        (速率限制错误带 retry-after 时暂停共享限流器)；已向调用方输出内容后失败则直接抛出。
+        每次尝试结束后按估算的输出 Token 数校正预留。
+
+        Args:
+            同 generate_stream()
+
+        Yields:
+            str: 响应文本片段
+        """
+        last_error: Optional[Exception] = None
+        input_tokens = self._estimate_input_tokens(prompt, system_prompt, context_blocks)
+        estimated_tokens = input_tokens + (max_tokens or self.config.max_tokens)
+
+        for attempt in range(self.config.max_retries):
+            can_retry = attempt < self.config.max_retries - 1
+            reservation = await self.rate_limiter.acquire(estimated_tokens)
+            used_tokens = input_tokens
+            rate_limited = False
+            started = False
+            try:
+                async for chunk in self.generate_stream(
+                    prompt,
+                    system_prompt,
+                    max_tokens,
+                    temperature,
+                    stop_sequences,
+                    context_blocks,
+                    **kwargs
+                ):
+                    started = True
+                    used_tokens += estimate_tokens(chunk)
+                    yield chunk
+                return
+            except RateLimitError as e:
+                rate_limited = True
+                if e.retry_after:
+                    self.rate_limiter.pause(e.retry_after)
+                if started or not can_retry:
+                    raise
+                last_error = e
+            except (AuthenticationError, InvalidRequestError, ModelNotFoundError):
+                # 这些错误不应重试
+                raise
+            except AIAdapterError as e:
+                if started or not can_retry:
+                    raise
+                last_error = e
+            finally:
+                # 429 的请求不计费
+                self.rate_limiter.release(reservation, None if rate_limited else used_tokens)
+
+            await asyncio.sleep(self._get_retry_delay(attempt))
+
+        # 重试耗尽
+        raise AIAdapterError(
+            f"Failed after {self.config.max_retries} retries"
+        ) from last_error
+
+    def _estimate_input_tokens(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        context_blocks: Optional[List[str]]
+    ) -> int:
+        """预估输入 Token 数 (内部使用)"""
+        return (
+            estimate_tokens(prompt)
+            + estimate_tokens(system_prompt)
+            + sum(estimate_tokens(block) for block in context_blocks or ())
+        )
+
+    def _get_retry_delay(self, attempt: int) -> float:
+        """第 attempt 次重试前的全抖动退避时间 (内部使用)"""
+        return full_jitter_backoff(attempt, self.config.retry_delay, self.config.max_retry_delay)
+
 
 # 工具函数
 
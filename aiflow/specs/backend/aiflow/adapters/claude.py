@@ -7,13 +7,17 @@ Claude API 适配器实现
 2. 流式和非流式响应
 3. 系统提示词支持
 4. Token 统计
-5. 错误处理和重试
+5. 错误处理和重试 (速率限制响应头反馈给共享限流器)
+6. 同一账号/端点的适配器实例共享客户端和连接池
+7. 共享上下文块使用提示词缓存 (cache_control)，统计缓存 Token 数
+8. 批量生成 (Message Batches API)
 """
 
 import asyncio
+import json
 import time
 from datetime import datetime
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, cast
 
 try:
     import anthropic
@@ -23,17 +27,23 @@ except ImportError:
         "anthropic SDK is required. Install with: pip install anthropic"
     )
 
+import httpx
+
 from .base import (
     AIAdapterError,
     AIProvider,
     AIResponse,
     AuthenticationError,
     BaseAIAdapter,
+    BatchRequest,
+    BatchResult,
     InvalidRequestError,
     ModelNotFoundError,
     RateLimitError,
     TokenUsage,
 )
+from .client_pool import client_key, create_http_client, get_client_pool
+from .rate_limiter import parse_retry_after
 
 
 class ClaudeAdapter(BaseAIAdapter):
@@ -52,16 +62,32 @@ class ClaudeAdapter(BaseAIAdapter):
         "claude-3-haiku-20240307": {"max_tokens": 4096, "context_window": 200000},
     }
 
+    # Message Batches API 路径
+    BATCHES_PATH = "/v1/messages/batches"
+
+    # 每个请求最多 4 个 cache_control 断点，留 1 个给调用方 (如 extra_params 中的 system)
+    MAX_CACHE_BREAKPOINTS = 3
+
     def __init__(self, config):
         """初始化 Claude 适配器"""
         super().__init__(config)
 
-        # 创建 Anthropic 客户端
-        self.client = AsyncAnthropic(
+        # Anthropic 客户端: 默认从共享客户端池获取 (同一账号/端点/连接池配置共用连接)
+        self._client_key = client_key(
+            AIProvider.CLAUDE.value,
+            config.api_base_url or "",
+            config.timeout,
+            config.max_connections,
+            config.max_keepalive_connections,
+            config.keepalive_expiry,
+            config.http2,
             api_key=config.api_key,
-            base_url=config.api_base_url,
-            timeout=config.timeout,
         )
+        self._own_client: Optional[AsyncAnthropic] = None
+        self._own_unretried_client: Optional[AsyncAnthropic] = None
+        if not config.shared_client:
+            self._own_client = self._create_client()
+            self._own_unretried_client = self._own_client.with_options(max_retries=0)
 
         # 验证模型
         if config.model_name not in self.SUPPORTED_MODELS:
@@ -70,6 +96,48 @@ class ClaudeAdapter(BaseAIAdapter):
                 f"Supported models: {', '.join(self.SUPPORTED_MODELS.keys())}"
             )
 
+    @property
+    def client(self) -> AsyncAnthropic:
+        """Anthropic 客户端 (共享客户端绑定当前事件循环，需在协程中访问)"""
+        if self._own_client is not None:
+            return self._own_client
+        return get_client_pool().get(self._client_key, self._create_client)
+
+    @property
+    def _unretried_client(self) -> AsyncAnthropic:
+        """
+        关闭 SDK 内部重试的客户端，与 client 共用连接 (内部使用)
+
+        generate() / generate_stream() 由 generate_with_retry / generate_stream_limited 和共享限流器
+        负责重试，SDK 内部的重试会绕过限流器。
+        """
+        if self._own_unretried_client is not None:
+            return self._own_unretried_client
+        return get_client_pool().get(
+            f"{self._client_key}:no-retry", lambda: self.client.with_options(max_retries=0)
+        )
+
+    def _create_client(self) -> AsyncAnthropic:
+        """创建 Anthropic 客户端 (内部使用)"""
+        config = self.config
+        return AsyncAnthropic(
+            api_key=config.api_key,
+            base_url=config.api_base_url,
+            timeout=config.timeout,
+            http_client=create_http_client(
+                config.timeout,
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+                http2=config.http2,
+            ),
+        )
+
+    async def close(self) -> None:
+        """关闭适配器独占的客户端 (共享客户端由 close_client_pool() 统一关闭)"""
+        if self._own_client is not None:
+            await self._own_client.close()
+
     async def generate(
         self,
         prompt: str,
@@ -77,42 +145,23 @@ class ClaudeAdapter(BaseAIAdapter):
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
         **kwargs: Any
     ) -> AIResponse:
         """生成响应（非流式）"""
         start_time = time.time()
 
-        # 参数准备
-        max_tokens = max_tokens or self.config.max_tokens
-        temperature = temperature if temperature is not None else self.config.temperature
-
-        # 构建消息
-        messages = [{"role": "user", "content": prompt}]
-
-        # 构建请求参数
-        request_params = {
-            "model": self.config.model_name,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-        }
-
-        if system_prompt:
-            request_params["system"] = system_prompt
-
-        if stop_sequences:
-            request_params["stop_sequences"] = stop_sequences
-
-        # 添加额外参数
-        if self.config.extra_params:
-            request_params.update(self.config.extra_params)
-
-        # 添加自定义参数
-        request_params.update(kwargs)
+        request_params = self._build_request_params(
+            prompt, system_prompt, max_tokens, temperature, stop_sequences, context_blocks, **kwargs
+        )
 
         try:
-            # 调用 Claude API
-            response = await self.client.messages.create(**request_params)
+            # 调用 Claude API (读取原始响应以获得速率限制头)
+            raw_response = await self._unretried_client.messages.with_raw_response.create(
+                **request_params
+            )
+            self._update_rate_limits(raw_response.headers)
+            response = raw_response.parse()
 
             # 计算响应时间
             response_time = time.time() - start_time
@@ -123,14 +172,21 @@ class ClaudeAdapter(BaseAIAdapter):
                 if block.type == "text":
                     content += block.text
 
+            # input_tokens 不包含缓存写入/命中的 Token
+            cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", None) or 0
+            cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", None) or 0
+            prompt_tokens = response.usage.input_tokens + cache_creation_tokens + cache_read_tokens
+
             # 构建响应
             return AIResponse(
                 content=content,
                 model=response.model,
                 usage=TokenUsage(
-                    prompt_tokens=response.usage.input_tokens,
+                    prompt_tokens=prompt_tokens,
                     completion_tokens=response.usage.output_tokens,
-                    total_tokens=response.usage.input_tokens + response.usage.output_tokens,
+                    total_tokens=prompt_tokens + response.usage.output_tokens,
+                    cache_creation_tokens=cache_creation_tokens,
+                    cache_read_tokens=cache_read_tokens,
                 ),
                 finish_reason=response.stop_reason or "stop",
                 response_time=response_time,
@@ -143,7 +199,7 @@ class ClaudeAdapter(BaseAIAdapter):
             )
 
         except AnthropicRateLimitError as e:
-            raise RateLimitError(f"Claude rate limit exceeded: {e}") from e
+            raise self._rate_limit_error(e) from e
         except APIStatusError as e:
             if e.status_code == 401:
                 raise AuthenticationError(f"Invalid API key: {e}") from e
@@ -165,20 +221,56 @@ class ClaudeAdapter(BaseAIAdapter):
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
         **kwargs: Any
     ) -> AsyncIterator[str]:
         """生成响应（流式）"""
+        request_params = self._build_request_params(
+            prompt, system_prompt, max_tokens, temperature, stop_sequences, context_blocks, **kwargs
+        )
+
+        try:
+            # 调用 Claude API (流式，读取响应头以更新速率限制)
+            async with self._unretried_client.messages.stream(**request_params) as stream:
+                self._update_rate_limits(stream.response.headers)
+                async for text in stream.text_stream:
+                    yield text
+
+        except AnthropicRateLimitError as e:
+            raise self._rate_limit_error(e) from e
+        except APIStatusError as e:
+            if e.status_code == 401:
+                raise AuthenticationError(f"Invalid API key: {e}") from e
+            elif e.status_code == 404:
+                raise ModelNotFoundError(f"Model not found: {e}") from e
+            elif e.status_code == 400:
+                raise InvalidRequestError(f"Invalid request: {e}") from e
+            else:
+                raise AIAdapterError(f"Claude API error: {e}") from e
+        except APIError as e:
+            raise AIAdapterError(f"Claude API error: {e}") from e
+        except Exception as e:
+            raise AIAdapterError(f"Unexpected error: {e}") from e
+
+    def _build_request_params(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        stop_sequences: Optional[List[str]] = None,
+        context_blocks: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """构建 Messages API 请求参数 (内部使用)"""
         # 参数准备
         max_tokens = max_tokens or self.config.max_tokens
         temperature = temperature if temperature is not None else self.config.temperature
 
-        # 构建消息
-        messages = [{"role": "user", "content": prompt}]
-
         # 构建请求参数
         request_params = {
             "model": self.config.model_name,
-            "messages": messages,
+            "messages": self._build_messages(prompt, context_blocks),
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
@@ -195,15 +287,80 @@ class ClaudeAdapter(BaseAIAdapter):
 
         # 添加自定义参数
         request_params.update(kwargs)
+        return request_params
+
+    def _build_messages(
+        self,
+        prompt: str,
+        context_blocks: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        构建用户消息 (内部使用)
+
+        共享上下文块放在 prompt 之前，最后 MAX_CACHE_BREAKPOINTS 个块标记 cache_control，
+        前缀相同的后续请求 (如同一任务的其他阶段) 直接读取服务端缓存。
+        """
+        if not context_blocks:
+            return [{"role": "user", "content": prompt}]
+
+        content: List[Dict[str, Any]] = [
+            {"type": "text", "text": block} for block in context_blocks
+        ]
+        if self.config.prompt_caching:
+            for block in content[-self.MAX_CACHE_BREAKPOINTS:]:
+                block["cache_control"] = {"type": "ephemeral"}
+        content.append({"type": "text", "text": prompt})
+        return [{"role": "user", "content": content}]
+
+    async def generate_batch(self, requests: List[BatchRequest]) -> List[BatchResult]:
+        """
+        批量生成 (Message Batches API)
+
+        提交一个批处理任务，每 batch_poll_interval 秒轮询一次直到处理结束，再读取 JSONL 结果。
+        超过 batch_timeout 或调用方取消时同时取消服务端批处理。
+        """
+        if not requests:
+            return []
 
+        start_time = time.time()
+        body = {
+            "requests": [
+                {
+                    "custom_id": request.custom_id,
+                    "params": self._build_request_params(
+                        request.prompt,
+                        request.system_prompt,
+                        request.max_tokens,
+                        request.temperature,
+                        request.stop_sequences,
+                        request.context_blocks,
+                    ),
+                }
+                for request in requests
+            ]
+        }
+
+        batch_path: Optional[str] = None
         try:
-            # 调用 Claude API (流式)
-            async with self.client.messages.stream(**request_params) as stream:
-                async for text in stream.text_stream:
-                    yield text
+            batch = cast(
+                Dict[str, Any],
+                await self.client.post(self.BATCHES_PATH, cast_to=object, body=body)
+            )
+            batch_path = f"{self.BATCHES_PATH}/{batch['id']}"
+
+            deadline = start_time + self.config.batch_timeout
+            while batch["processing_status"] != "ended":
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise AIAdapterError(f"Claude batch timed out: {batch['id']}")
+                await asyncio.sleep(min(self.config.batch_poll_interval, remaining))
+                batch = cast(Dict[str, Any], await self.client.get(batch_path, cast_to=object))
+
+            raw_results = await self.client.get(f"{batch_path}/results", cast_to=httpx.Response)
+            batch_path = None
 
         except AnthropicRateLimitError as e:
-            raise RateLimitError(f"Claude rate limit exceeded: {e}") from e
+            raise self._rate_limit_error(e) from e
         except APIStatusError as e:
             if e.status_code == 401:
                 raise AuthenticationError(f"Invalid API key: {e}") from e
@@ -215,8 +372,109 @@ class ClaudeAdapter(BaseAIAdapter):
                 raise AIAdapterError(f"Claude API error: {e}") from e
         except APIError as e:
             raise AIAdapterError(f"Claude API error: {e}") from e
+        except (AIAdapterError, asyncio.CancelledError):
+            raise
         except Exception as e:
             raise AIAdapterError(f"Unexpected error: {e}") from e
+        finally:
+            # 未读取结果就退出 (超时、取消或出错)：取消服务端批处理
+            if batch_path is not None:
+                await asyncio.shield(self._cancel_batch(batch_path))
+
+        # 解析结果 (每行一个请求，顺序不保证)
+        response_time = time.time() - start_time
+        results: Dict[str, BatchResult] = {}
+        for line in raw_results.text.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                results[entry["custom_id"]] = self._parse_batch_entry(entry, response_time)
+
+        return [
+            results.get(request.custom_id)
+            or BatchResult(custom_id=request.custom_id, error="Missing batch result")
+            for request in requests
+        ]
+
+    async def _cancel_batch(self, batch_path: str) -> None:
+        """取消服务端批处理，失败时忽略 (内部使用)"""
+        try:
+            await self.client.post(f"{batch_path}/cancel", cast_to=object)
+        except Exception:
+            pass
+
+    def _parse_batch_entry(self, entry: Dict[str, Any], response_time: float) -> BatchResult:
+        """将批处理结果行转换为 BatchResult (内部使用)"""
+        custom_id = entry["custom_id"]
+        result = entry["result"]
+        if result["type"] != "succeeded":
+            # errored / canceled / expired
+            error = f"Claude batch request {result['type']}"
+            message = ((result.get("error") or {}).get("error") or {}).get("message")
+            if message:
+                error += f": {message}"
+            return BatchResult(custom_id=custom_id, error=error)
+
+        message = result["message"]
+        usage = message["usage"]
+        cache_creation_tokens = usage.get("cache_creation_input_tokens") or 0
+        cache_read_tokens = usage.get("cache_read_input_tokens") or 0
+        prompt_tokens = usage["input_tokens"] + cache_creation_tokens + cache_read_tokens
+
+        return BatchResult(
+            custom_id=custom_id,
+            response=AIResponse(
+                content="".join(
+                    block["text"] for block in message["content"] if block["type"] == "text"
+                ),
+                model=message["model"],
+                usage=TokenUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=usage["output_tokens"],
+                    total_tokens=prompt_tokens + usage["output_tokens"],
+                    cache_creation_tokens=cache_creation_tokens,
+                    cache_read_tokens=cache_read_tokens,
+                ),
+                finish_reason=message.get("stop_reason") or "stop",
+                response_time=response_time,
+                created_at=datetime.now(),
+                metadata={
+                    "id": message["id"],
+                    "stop_reason": message.get("stop_reason"),
+                    "role": message["role"],
+                    "batch": True,
+                },
+            ),
+        )
+
+    def _rate_limit_error(self, error: AnthropicRateLimitError) -> RateLimitError:
+        """将 SDK 的 429 错误转换为 RateLimitError，并把响应头反馈给限流器 (内部使用)"""
+        headers = error.response.headers
+        self._update_rate_limits(headers)
+        return RateLimitError(
+            f"Claude rate limit exceeded: {error}",
+            retry_after=parse_retry_after(headers.get("retry-after")),
+        )
+
+    def _update_rate_limits(self, headers: Any) -> None:
+        """
+        根据 anthropic-ratelimit-* 响应头调整共享限流器 (内部使用)
+
+        没有合并的 tokens 头时使用 input-tokens 头 (对输入+输出预算而言偏保守)。
+        """
+        def header_int(name: str) -> Optional[int]:
+            try:
+                return int(headers[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        prefix = "anthropic-ratelimit-"
+        tokens = "tokens" if f"{prefix}tokens-limit" in headers else "input-tokens"
+        self.rate_limiter.update_limits(
+            requests_limit=header_int(f"{prefix}requests-limit"),
+            requests_remaining=header_int(f"{prefix}requests-remaining"),
+            tokens_limit=header_int(f"{prefix}{tokens}-limit"),
+            tokens_remaining=header_int(f"{prefix}{tokens}-remaining"),
+        )
 
     async def validate_connection(self) -> bool:
         """验证连接是否可用"""
@@ -286,10 +544,264 @@ async def create_claude_adapter(
     return ClaudeAdapter(config)
 
 
+async def benchmark_client_pool(
+    num_requests: int = 500,
+    concurrency: int = 50,
+    connect_delay: float = 0.0
+) -> Dict[str, Dict[str, float]]:
+    """
+    客户端池性能基准 (本地 HTTP 桩服务器)
+
+    模拟每个任务新建一个适配器并发送一次请求:
+    1. cold: 每个适配器独占客户端 (每次请求都新建连接)
+    2. warm: 适配器共享客户端池 (预热后复用 keep-alive 连接)
+
+    Args:
+        num_requests: 请求数 (默认 500)
+        concurrency: 并发请求数 (默认 50)
+        connect_delay: 桩服务器对每个新连接的额外延迟(秒)，用于模拟 TLS 握手 (默认 0)
+
+    Returns:
+        Dict[str, Dict[str, float]]: 各模式的基准结果 (延迟单位: 毫秒)
+    """
+    from .base import AIModelConfig
+    from .client_pool import close_client_pool
+
+    body = json.dumps({
+        "id": "msg_bench",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-3-haiku-20240307",
+        "content": [{"type": "text", "text": "ok"}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    }).encode("utf-8")
+    response = (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body
+    )
+    connections = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal connections
+        connections += 1
+        await asyncio.sleep(connect_delay)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def percentile(values: List[float], pct: float) -> float:
+        index = min(len(values) - 1, int(len(values) * pct / 100))
+        return values[index] * 1000
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    def make_adapter(shared: bool) -> ClaudeAdapter:
+        return ClaudeAdapter(AIModelConfig(
+            provider=AIProvider.CLAUDE,
+            model_name="claude-3-haiku-20240307",
+            api_key="bench",
+            api_base_url=f"http://127.0.0.1:{port}",
+            shared_client=shared,
+            max_keepalive_connections=concurrency,
+        ))
+
+    async def run(shared: bool) -> Dict[str, float]:
+        nonlocal connections
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+
+        async def job() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                adapter = make_adapter(shared)
+                await adapter.generate("ping", max_tokens=1)
+                latencies.append(time.perf_counter() - start)
+                await adapter.close()
+
+        if shared:
+            # 预热: 建立 concurrency 个 keep-alive 连接
+            await asyncio.gather(*(make_adapter(True).generate("ping") for _ in range(concurrency)))
+        connections = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(job() for _ in range(num_requests)))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        return {
+            "requests_per_sec": num_requests / elapsed,
+            "latency_p50_ms": percentile(latencies, 50),
+            "latency_p99_ms": percentile(latencies, 99),
+            "new_connections": connections,
+        }
+
+    try:
+        return {"cold": await run(shared=False), "warm": await run(shared=True)}
+    finally:
+        await close_client_pool()
+        server.close()
+        await server.wait_closed()
+
+
+async def benchmark_batch(
+    num_requests: int = 200,
+    processing_polls: int = 2
+) -> Dict[str, Dict[str, float]]:
+    """
+    批量生成基准 (本地 HTTP 桩服务器，实现 Messages 和 Message Batches 接口)
+
+    比较两种方式完成 num_requests 个请求:
+    1. interactive: 并发调用 generate_with_retry (每个请求一次 HTTP 往返)
+    2. batch: generate_batch (提交 + 轮询 + 读取结果)
+
+    Args:
+        num_requests: 请求数 (默认 200)
+        processing_polls: 桩服务器在第几次状态查询时报告批处理结束 (默认 2)
+
+    Returns:
+        Dict[str, Dict[str, float]]: 各模式的基准结果
+    """
+    from .base import AIModelConfig
+
+    def message(custom_id: str) -> Dict[str, Any]:
+        return {
+            "id": f"msg_{custom_id}",
+            "type": "message",
+            "role": "assistant",
+            "model": "claude-3-haiku-20240307",
+            "content": [{"type": "text", "text": "ok"}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+
+    batches: Dict[str, Dict[str, Any]] = {}
+    http_requests = 0
+
+    def route(method: str, path: str, body: Any) -> Tuple[str, bytes]:
+        if path == "/v1/messages":
+            return "application/json", json.dumps(message("single")).encode("utf-8")
+        if method == "POST" and path == ClaudeAdapter.BATCHES_PATH:
+            batch_id = f"msgbatch_{len(batches)}"
+            batches[batch_id] = {"requests": body["requests"], "polls": 0}
+            path = f"{ClaudeAdapter.BATCHES_PATH}/{batch_id}"
+        batch_id = path[len(ClaudeAdapter.BATCHES_PATH) + 1:].split("/")[0]
+        batch = batches[batch_id]
+        if path.endswith("/results"):
+            lines = [
+                json.dumps({
+                    "custom_id": request["custom_id"],
+                    "result": {"type": "succeeded", "message": message(request["custom_id"])},
+                })
+                for request in batch["requests"]
+            ]
+            return "application/x-jsonl", "\n".join(lines).encode("utf-8")
+        if method == "GET":
+            batch["polls"] += 1
+        status = "ended" if batch["polls"] >= processing_polls else "in_progress"
+        return "application/json", json.dumps({
+            "id": batch_id, "type": "message_batch", "processing_status": status,
+        }).encode("utf-8")
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal http_requests
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                length = 0
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length)
+                http_requests += 1
+                content_type, payload = route(
+                    method, target.split("?")[0], json.loads(body) if body else None
+                )
+                writer.write(
+                    f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii") + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    adapter = ClaudeAdapter(AIModelConfig(
+        provider=AIProvider.CLAUDE,
+        model_name="claude-3-haiku-20240307",
+        api_key="bench",
+        api_base_url=f"http://127.0.0.1:{port}",
+        shared_client=False,
+        batch_poll_interval=0.05,
+    ))
+    requests = [BatchRequest(custom_id=f"req-{i}", prompt="ping") for i in range(num_requests)]
+
+    async def run(batch: bool) -> Dict[str, float]:
+        nonlocal http_requests
+        http_requests = 0
+        start = time.perf_counter()
+        if batch:
+            results = await adapter.generate_batch(requests)
+        else:
+            results = await BaseAIAdapter.generate_batch(adapter, requests)
+        return {
+            "elapsed_s": time.perf_counter() - start,
+            "http_requests": http_requests,
+            "succeeded": sum(1 for result in results if result.response is not None),
+        }
+
+    try:
+        return {"interactive": await run(batch=False), "batch": await run(batch=True)}
+    finally:
+        await adapter.close()
+        server.close()
+        await server.wait_closed()
+
+
 # CLI 测试入口
 if __name__ == "__main__":
     import sys
 
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        # python -m aiflow.adapters.claude bench [num_requests] [connect_delay]
+        num = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+        delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+        results = asyncio.run(benchmark_client_pool(num, connect_delay=delay))
+        for mode, stats in results.items():
+            print(mode)
+            for key, value in stats.items():
+                print(f"  {key}: {value:.3f}")
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench-batch":
+        # python -m aiflow.adapters.claude bench-batch [num_requests]
+        num = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        results = asyncio.run(benchmark_batch(num))
+        for mode, stats in results.items():
+            print(mode)
+            for key, value in stats.items():
+                print(f"  {key}: {value:.3f}")
+        sys.exit(0)
+
     async def main():
         if len(sys.argv) < 2:
             print("Usage: python claude.py <prompt>")
@@ -0,0 +1,140 @@
+"""
+AIFlow Client Pool
+进程内共享的 HTTP 客户端池 - 同一账号/端点的适配器实例复用连接
+
+核心功能:
+1. 按键共享 SDK 客户端 (连接池、keep-alive、TLS 会话)，避免每个任务重新握手
+2. 可配置连接池大小和 keep-alive 时间，安装了 h2 时启用 HTTP/2
+3. 客户端按事件循环分别保存 (连接绑定事件循环)
+4. close_client_pool() 统一关闭
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import weakref
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# 是否安装了 HTTP/2 支持 (httpx[http2] / h2)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def create_http_client(
+    timeout: float,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = True
+) -> httpx.AsyncClient:
+    """
+    创建带连接池配置的 httpx 异步客户端
+
+    Args:
+        timeout: 超时时间(秒)
+        max_connections: 最大连接数
+        max_keepalive_connections: 最大空闲 keep-alive 连接数
+        keepalive_expiry: 空闲连接保持时间(秒)
+        http2: 是否启用 HTTP/2 (未安装 h2 时忽略)
+
+    Returns:
+        httpx.AsyncClient: HTTP 客户端
+    """
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2 and HTTP2_AVAILABLE,
+        follow_redirects=True,
+    )
+
+
+def client_key(*parts: Any, api_key: str) -> str:
+    """
+    计算共享客户端的键 (不保存 API 密钥明文)
+
+    Args:
+        *parts: 影响客户端行为的配置 (提供商、端点、超时、连接池配置等)
+        api_key: API 密钥
+
+    Returns:
+        str: 客户端键
+    """
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return ":".join(str(part) for part in (*parts, key_hash))
+
+
+class ClientPool:
+    """
+    按键共享的客户端池
+
+    客户端必须提供 close() 协程 (如 AsyncAnthropic) 或 aclose() 协程 (如 httpx.AsyncClient)。
+    """
+
+    def __init__(self) -> None:
+        # 连接绑定事件循环，按循环分别保存
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = \
+            weakref.WeakKeyDictionary()
+
+        # 统计
+        self.created = 0
+        self.reused = 0
+
+    def get(self, key: str, factory: Callable[[], T]) -> T:
+        """
+        获取 (或创建) 当前事件循环中的共享客户端
+
+        Args:
+            key: 客户端键 (见 client_key)
+            factory: 创建客户端的函数
+
+        Returns:
+            客户端
+        """
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = factory()
+            self.created += 1
+        else:
+            self.reused += 1
+        return client
+
+    async def close(self) -> None:
+        """关闭当前事件循环中的所有客户端"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            close = getattr(client, "close", None) or client.aclose
+            await close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取客户端池统计信息"""
+        return {
+            "clients": sum(len(clients) for clients in self._clients.values()),
+            "created": self.created,
+            "reused": self.reused,
+        }
+
+
+# 全局客户端池实例
+_global_pool: Optional[ClientPool] = None
+
+
+def get_client_pool() -> ClientPool:
+    """获取全局客户端池"""
+    global _global_pool
+    if _global_pool is None:
+        _global_pool = ClientPool()
+    return _global_pool
+
+
+async def close_client_pool() -> None:
+    """关闭全局客户端池中当前事件循环的所有客户端 (应用退出前调用)"""
+    if _global_pool is not None:
+        await _global_pool.close()
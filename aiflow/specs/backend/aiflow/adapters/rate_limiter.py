@@ -0,0 +1,343 @@
+"""
+AIFlow Rate Limiter
+客户端速率限制 - 按账号共享的 RPM/TPM 令牌桶和并发控制
+
+核心功能:
+1. 请求数 (RPM) 和 Token 数 (TPM) 双令牌桶，发送前按预估 Token 预留额度
+2. 预留允许透支：后来的请求按透支额排队等待 (先到先得，不会同时醒来)
+3. 根据响应中的速率限制头调整限额和剩余额度
+4. 收到 429 时整体暂停 (retry-after)，所有共享该限流器的请求一起等待
+5. 全抖动 (full jitter) 指数退避
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+# 预留凭据: (预留的 Token 数, 占用的并发信号量)
+Reservation = Tuple[int, Optional[asyncio.Semaphore]]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    粗略估算文本的 Token 数 (发送前预留额度用，不需要精确)
+
+    ASCII 字符约 4 个一个 Token，其他字符 (如中文) 约 1 个一个 Token。
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: 预估 Token 数
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def full_jitter_backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    全抖动指数退避: uniform(0, min(max_delay, base_delay * 2^attempt))
+
+    Args:
+        attempt: 第几次重试 (从 0 开始)
+        base_delay: 基础延迟(秒)
+        max_delay: 最大延迟(秒)
+
+    Returns:
+        float: 等待时间(秒)
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 retry-after 响应头 (秒数或 HTTP 日期)
+
+    Args:
+        value: 响应头的值
+
+    Returns:
+        Optional[float]: 等待时间(秒)，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _TokenBucket:
+    """每分钟补满的令牌桶，余额可以为负 (透支的部分按速率排队) (内部使用)"""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.limit: Optional[float] = None
+        self.rate = 0.0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_limit(per_minute)
+
+    def set_limit(self, per_minute: Optional[float]) -> None:
+        """设置每分钟限额 (None 表示不限)"""
+        self._refill(time.monotonic())
+        if per_minute is None or per_minute <= 0:
+            self.limit = None
+            return
+        if self.limit is None:
+            self.tokens = float(per_minute)
+        self.limit = float(per_minute)
+        self.rate = self.limit / 60.0
+        self.tokens = min(self.tokens, self.limit)
+
+    def _refill(self, now: float) -> None:
+        if self.limit is not None:
+            self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """预留额度，返回需要等待的时间(秒)"""
+        if self.limit is None:
+            return 0.0
+        self._refill(now)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        """退还额度 (预留多了或请求未发出)"""
+        if self.limit is None:
+            return
+        self._refill(time.monotonic())
+        self.tokens = min(self.limit, self.tokens + amount)
+
+    def clamp(self, remaining: float) -> None:
+        """按服务端报告的剩余额度收紧本地余额"""
+        if self.limit is None:
+            return
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimiter:
+    """
+    RPM/TPM 速率限制器 + 并发控制
+
+    用法:
+        reservation = await limiter.acquire(estimated_tokens)
+        try:
+            response = ...
+        finally:
+            limiter.release(reservation, used_tokens)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrent: Optional[int] = None
+    ):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_minute: 每分钟请求数 (可选，None 表示不限，可由响应头补充)
+            tokens_per_minute: 每分钟 Token 数 (可选，None 表示不限，可由响应头补充)
+            max_concurrent: 最大并发请求数 (可选，None 表示不限)
+        """
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        # 配置的限额是上限，响应头只能收紧
+        self._requests_cap = requests_per_minute
+        self._tokens_cap = tokens_per_minute
+        self.max_concurrent = max_concurrent
+        self._paused_until = 0.0
+        # 信号量绑定事件循环，按循环分别创建
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+        # 统计
+        self.requests = 0
+        self.throttled = 0
+        self.throttle_time = 0.0
+        self.pauses = 0
+
+    def set_limits(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrent: Optional[int] = None
+    ) -> None:
+        """更新限额 (None 表示保持不变)"""
+        if requests_per_minute is not None:
+            self._requests_cap = requests_per_minute
+            self._requests.set_limit(requests_per_minute)
+        if tokens_per_minute is not None:
+            self._tokens_cap = tokens_per_minute
+            self._tokens.set_limit(tokens_per_minute)
+        if max_concurrent is not None and max_concurrent != self.max_concurrent:
+            self.max_concurrent = max_concurrent
+            self._semaphores = weakref.WeakKeyDictionary()
+
+    async def acquire(self, tokens: int) -> Reservation:
+        """
+        等待直到可以发送一个预估 tokens 个 Token 的请求
+
+        Args:
+            tokens: 预估 Token 数 (输入 + 最大输出)
+
+        Returns:
+            Reservation: 预留凭据，交给 release()
+        """
+        semaphore = self._get_semaphore()
+        if semaphore is not None:
+            await semaphore.acquire()
+
+        now = time.monotonic()
+        wait = max(
+            self._paused_until - now,
+            self._requests.reserve(1, now),
+            self._tokens.reserve(tokens, now),
+        )
+        self.requests += 1
+
+        if wait > 0:
+            self.throttled += 1
+            self.throttle_time += wait
+            try:
+                await asyncio.sleep(wait)
+                # 等待期间可能收到了 retry-after
+                while self._paused_until > time.monotonic():
+                    await asyncio.sleep(self._paused_until - time.monotonic())
+            except BaseException:
+                self._requests.refund(1)
+                self._tokens.refund(tokens)
+                if semaphore is not None:
+                    semaphore.release()
+                raise
+
+        return tokens, semaphore
+
+    def release(self, reservation: Reservation, used_tokens: Optional[int] = None) -> None:
+        """
+        请求结束：按实际用量校正 Token 预留并释放并发槽位
+
+        Args:
+            reservation: acquire() 的返回值
+            used_tokens: 实际使用的 Token 数 (None 表示请求未被计费，如 429)
+        """
+        reserved_tokens, semaphore = reservation
+        self._tokens.refund(reserved_tokens - (used_tokens or 0))
+        if semaphore is not None:
+            semaphore.release()
+
+    def pause(self, seconds: float) -> None:
+        """暂停所有请求 seconds 秒 (如 retry-after)"""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self.pauses += 1
+
+    def update_limits(
+        self,
+        requests_limit: Optional[int] = None,
+        requests_remaining: Optional[int] = None,
+        tokens_limit: Optional[int] = None,
+        tokens_remaining: Optional[int] = None
+    ) -> None:
+        """
+        根据服务端报告的限额/剩余额度 (速率限制响应头) 调整令牌桶
+
+        限额按每分钟处理，且不超过配置的限额；剩余额度只会收紧本地余额，不会放宽。
+        """
+        if requests_limit is not None:
+            self._requests.set_limit(min(requests_limit, self._requests_cap or requests_limit))
+        if requests_remaining is not None:
+            self._requests.clamp(requests_remaining)
+        if tokens_limit is not None:
+            self._tokens.set_limit(min(tokens_limit, self._tokens_cap or tokens_limit))
+        if tokens_remaining is not None:
+            self._tokens.clamp(tokens_remaining)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限流统计信息"""
+        return {
+            "requests_per_minute": self._requests.limit,
+            "tokens_per_minute": self._tokens.limit,
+            "max_concurrent": self.max_concurrent,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "throttle_time": self.throttle_time,
+            "pauses": self.pauses,
+        }
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        """当前事件循环的并发信号量 (内部使用)"""
+        if not self.max_concurrent:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrent)
+        return semaphore
+
+
+# 进程内共享的限流器 (同一账号/端点/模型共用一份额度)
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def rate_limiter_key(provider: str, api_key: str, api_base_url: Optional[str], model: str) -> str:
+    """
+    计算共享限流器的键 (不保存 API 密钥明文)
+
+    Args:
+        provider: AI 提供商
+        api_key: API 密钥
+        api_base_url: API 地址
+        model: 模型名称
+
+    Returns:
+        str: 限流器键
+    """
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return f"{provider}:{api_base_url or ''}:{key_hash}:{model}"
+
+
+def get_rate_limiter(
+    key: str,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+    max_concurrent: Optional[int] = None
+) -> RateLimiter:
+    """
+    获取 (或创建) 进程内共享的限流器
+
+    Args:
+        key: 限流器键 (见 rate_limiter_key)
+        requests_per_minute: 每分钟请求数 (可选，给出时更新已有限流器)
+        tokens_per_minute: 每分钟 Token 数 (可选，给出时更新已有限流器)
+        max_concurrent: 最大并发请求数 (可选，给出时更新已有限流器)
+
+    Returns:
+        RateLimiter: 限流器
+    """
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        limiter = _rate_limiters[key] = RateLimiter(
+            requests_per_minute, tokens_per_minute, max_concurrent
+        )
+    else:
+        limiter.set_limits(requests_per_minute, tokens_per_minute, max_concurrent)
+    return limiter
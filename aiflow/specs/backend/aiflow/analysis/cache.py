@@ -0,0 +1,431 @@
+"""
+AIFlow Stage Result Cache
+阶段结果缓存 - 内容寻址的持久化磁盘缓存
+
+核心功能:
+1. 按 (阶段输入, 模板 ID/版本, 模型, 温度, 项目哈希) 计算缓存键
+2. 持久化到磁盘 (每个条目一个 JSON 文件 + 索引文件)
+3. LRU 淘汰 (按条目数和总大小)，命中时只更新内存中的 LRU 顺序，写入/失效/flush 时落盘
+4. 命中/未命中统计
+5. 支持 /api/cache/{project_hash} 查询和 /api/cache/{cache_id} 失效
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 不参与缓存键计算的输入字段 (每次运行都会变化)
+VOLATILE_INPUT_KEYS = frozenset({"current_timestamp_iso8601"})
+
+
+class CacheError(Exception):
+    """缓存错误"""
+    pass
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目元数据"""
+    key: str
+    project_hash: str
+    stage: str
+    template_id: str
+    template_version: str
+    model: str
+    size_bytes: int
+    created_at: str  # ISO 8601
+    last_accessed_at: str  # ISO 8601
+    hit_count: int = 0
+
+    @property
+    def cache_id(self) -> str:
+        """API 使用的缓存 ID"""
+        return f"cache-{self.key}"
+
+
+def compute_file_hashes(project_path: Path) -> Dict[str, str]:
+    """
+    计算项目内每个文件的内容哈希
+
+    与 AnalysisEngine._get_file_tree 一致，跳过隐藏目录。
+
+    Args:
+        project_path: 项目路径
+
+    Returns:
+        Dict[str, str]: 文件相对路径 (POSIX) → sha256 十六进制
+    """
+    file_hashes: Dict[str, str] = {}
+
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            file_path = Path(root) / name
+            digest = hashlib.sha256()
+            try:
+                with open(file_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b""):
+                        digest.update(chunk)
+            except OSError:
+                continue
+            file_hashes[file_path.relative_to(project_path).as_posix()] = digest.hexdigest()
+
+    return file_hashes
+
+
+def compute_project_hash(
+    project_path: Path,
+    file_hashes: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    计算项目内容哈希 (文件相对路径 + 文件内容)
+
+    Args:
+        project_path: 项目路径
+        file_hashes: 已计算的文件哈希 (可选，避免重复读取文件)
+
+    Returns:
+        str: 项目哈希 ("sha256-..." 格式)
+    """
+    if file_hashes is None:
+        file_hashes = compute_file_hashes(project_path)
+
+    digest = hashlib.sha256()
+    for rel_path in sorted(file_hashes):
+        digest.update(rel_path.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(file_hashes[rel_path].encode("ascii"))
+        digest.update(b"\0")
+
+    return f"sha256-{digest.hexdigest()}"
+
+
+class StageResultCache:
+    """阶段结果缓存"""
+
+    INDEX_FILE = "index.json"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_entries: int = 1000,
+        max_size_bytes: int = 512 * 1024 * 1024
+    ) -> None:
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_entries: 最大条目数 (默认 1000)
+            max_size_bytes: 最大总大小 (默认 512MB)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+
+        # LRU 索引 (最久未使用的在最前)
+        self._index: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._total_size = 0
+        self._index_dirty = False  # 内存索引有未落盘的修改 (LRU 顺序、命中次数)
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(
+        stage_input: Dict[str, Any],
+        template_id: str,
+        template_version: str,
+        model: str,
+        temperature: float,
+        project_hash: str = ""
+    ) -> str:
+        """
+        计算缓存键
+
+        Args:
+            stage_input: 阶段输入数据
+            template_id: Prompt 模板 ID
+            template_version: Prompt 模板版本
+            model: 模型名称
+            temperature: 温度参数
+            project_hash: 项目内容哈希 (可选)
+
+        Returns:
+            str: 缓存键 (sha256 十六进制)
+        """
+        payload = {
+            "input": {
+                k: v for k, v in stage_input.items() if k not in VOLATILE_INPUT_KEYS
+            },
+            "template_id": template_id,
+            "template_version": template_version,
+            "model": model,
+            "temperature": temperature,
+            "project_hash": project_hash,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存 (不写磁盘索引，LRU 顺序和命中次数在下次落盘时保存)
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict[str, Any]]: 阶段结果数据，未命中返回 None
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # 条目文件丢失或损坏
+            self._remove(key)
+            self._index_dirty = True
+            self.misses += 1
+            return None
+
+        entry.hit_count += 1
+        entry.last_accessed_at = datetime.now().isoformat()
+        self._index.move_to_end(key)
+        self._index_dirty = True
+
+        self.hits += 1
+        return data
+
+    def put(
+        self,
+        key: str,
+        data: Dict[str, Any],
+        project_hash: str,
+        stage: str,
+        template_id: str = "",
+        template_version: str = "",
+        model: str = ""
+    ) -> CacheEntry:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            data: 阶段结果数据
+            project_hash: 项目内容哈希
+            stage: 分析阶段
+            template_id: Prompt 模板 ID
+            template_version: Prompt 模板版本
+            model: 模型名称
+
+        Returns:
+            CacheEntry: 缓存条目
+
+        Raises:
+            CacheError: 写入失败
+        """
+        content = json.dumps(data, ensure_ascii=False)
+        size = len(content.encode("utf-8"))
+
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            raise CacheError(f"Failed to write cache entry: {e}") from e
+
+        if key in self._index:
+            self._remove(key, delete_file=False)
+
+        now = datetime.now().isoformat()
+        entry = CacheEntry(
+            key=key,
+            project_hash=project_hash,
+            stage=stage,
+            template_id=template_id,
+            template_version=template_version,
+            model=model,
+            size_bytes=size,
+            created_at=now,
+            last_accessed_at=now,
+        )
+        self._index[key] = entry
+        self._total_size += size
+
+        self._evict()
+        self._save_index()
+        return entry
+
+    def get_cache_info(
+        self,
+        project_hash: str,
+        stage: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        查询项目缓存 (对应 GET /api/cache/{project_hash})
+
+        Args:
+            project_hash: 项目内容哈希
+            stage: 分析阶段 (可选，None 表示最近写入的条目)
+
+        Returns:
+            Dict[str, Any]: 缓存信息
+        """
+        candidates = [
+            entry for entry in self._index.values()
+            if entry.project_hash == project_hash and (stage is None or entry.stage == stage)
+        ]
+        if not candidates:
+            return {"cache_exists": False, "project_hash": project_hash}
+
+        entry = max(candidates, key=lambda e: e.created_at)
+        return {
+            "cache_exists": True,
+            "cache_id": entry.cache_id,
+            "project_hash": entry.project_hash,
+            "stage": entry.stage,
+            "created_at": entry.created_at,
+            "hit_count": entry.hit_count,
+            "is_valid": self._entry_path(entry.key).exists(),
+        }
+
+    def invalidate(self, cache_id: str) -> Dict[str, Any]:
+        """
+        使缓存失效 (对应 DELETE /api/cache/{cache_id})
+
+        Args:
+            cache_id: 缓存 ID ("cache-" + 缓存键)
+
+        Returns:
+            Dict[str, Any]: 操作结果
+
+        Raises:
+            CacheError: 索引写入失败
+        """
+        key = cache_id[len("cache-"):] if cache_id.startswith("cache-") else cache_id
+        success = key in self._index
+        if success:
+            self._remove(key)
+            self._save_index()
+
+        return {
+            "success": success,
+            "cache_id": cache_id,
+            "deleted_at": datetime.now().isoformat(),
+        }
+
+    def clear(self) -> None:
+        """
+        清空缓存
+
+        Raises:
+            CacheError: 索引写入失败
+        """
+        for key in list(self._index):
+            self._remove(key)
+        self._save_index()
+
+    def flush(self) -> None:
+        """
+        将内存索引的未落盘修改 (LRU 顺序、命中次数) 写入磁盘
+
+        Raises:
+            CacheError: 索引写入失败
+        """
+        if self._index_dirty:
+            self._save_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "size_bytes": self._total_size,
+            "max_entries": self.max_entries,
+            "max_size_bytes": self.max_size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _entry_path(self, key: str) -> Path:
+        """条目文件路径 (内部使用)"""
+        return self.entries_dir / f"{key}.json"
+
+    def _remove(self, key: str, delete_file: bool = True) -> None:
+        """移除条目，条目文件删除失败时只从索引中移除 (内部使用)"""
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+
+        self._total_size -= entry.size_bytes
+        if delete_file:
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                # 文件已不存在或无权删除：残留文件会被同键的 put 覆盖
+                pass
+
+    def _evict(self) -> None:
+        """按 LRU 淘汰超限条目 (内部使用)"""
+        while self._index and (
+            len(self._index) > self.max_entries or self._total_size > self.max_size_bytes
+        ):
+            oldest_key = next(iter(self._index))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _load_index(self) -> None:
+        """加载索引文件 (内部使用)"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return
+
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                raw_entries = json.load(f)
+            entries = sorted(
+                (CacheEntry(**raw) for raw in raw_entries),
+                key=lambda e: e.last_accessed_at
+            )
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            # 索引损坏 (无法解析或结构不对)：从空缓存开始
+            return
+
+        for entry in entries:
+            if not self._entry_path(entry.key).exists():
+                continue
+            self._index[entry.key] = entry
+            self._total_size += entry.size_bytes
+
+        self._evict()
+
+    def _save_index(self) -> None:
+        """原子写入索引文件，失败时抛出 CacheError (内部使用)"""
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([asdict(e) for e in self._index.values()], f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            raise CacheError(f"Failed to write cache index: {e}") from e
+        self._index_dirty = False
@@ -8,22 +8,35 @@ AI 分析调度引擎 - 协调 5 阶段分析流程
 3. AI 模型调用
 4. 结果验证和合并
 5. 进度追踪和状态管理
+6. 流式阶段模式 (增量解析 JSON，nodes/edges 逐个回调)
+7. 批处理模式 (多个任务的阶段 Prompt 合并为一次批量生成)
 """
 
 import asyncio
 import json
-from dataclasses import dataclass
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Set, Tuple
 from uuid import uuid4
 
-from ..adapters.base import BaseAIAdapter, AIResponse
+from ..adapters.base import BaseAIAdapter, AIResponse, BatchRequest, TokenUsage
+from ..adapters.rate_limiter import estimate_tokens
 from ..prompts.manager import PromptTemplateManager
-from ..prompts.renderer import PromptRenderer
+from ..prompts.renderer import PromptRenderer, RenderedPrompt
 from ..protocol.validator import ProtocolValidator, ValidationResult
 from ..protocol.serializer import ProtocolSerializer
+from .cache import CacheError, StageResultCache, compute_file_hashes, compute_project_hash
+from .incremental import (
+    diff_file_hashes,
+    find_affected_files,
+    merge_incremental_result,
+    normalize_file_path,
+)
+from .streaming import IncrementalJSONParser, StreamingJSONError
 
 
 class AnalysisStage(Enum):
@@ -55,6 +68,7 @@ class StageResult:
     validation_result: Optional[ValidationResult] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    cache_hit: bool = False  # 是否来自结果缓存
 
     @property
     def duration(self) -> Optional[float]:
@@ -75,6 +89,11 @@ class AnalysisJob:
     current_stage: Optional[AnalysisStage] = None
     stage_results: Dict[AnalysisStage, StageResult] = None
     final_result: Optional[Dict[str, Any]] = None
+    project_hash: Optional[str] = None  # 项目内容哈希
+    file_hashes: Dict[str, str] = field(default_factory=dict)  # 文件相对路径 → 内容哈希
+    base_job_id: Optional[str] = None  # 增量分析的基线任务 ID
+    changed_files: List[str] = field(default_factory=list)  # 调用方声明的变更文件
+    scope_files: Optional[List[str]] = None  # 增量分析范围 (None 表示全量)
     created_at: datetime = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
@@ -96,6 +115,9 @@ class AnalysisJob:
 # 进度回调类型
 ProgressCallback = Callable[[AnalysisJob, AnalysisStage, float], None]
 
+# 流式元素回调类型: (任务, 阶段, 数组路径如 "code_structure.nodes", 元素)
+StreamItemCallback = Callable[[AnalysisJob, AnalysisStage, str, Any], None]
+
 
 class AnalysisEngine:
     """分析调度引擎"""
@@ -109,11 +131,49 @@ class AnalysisEngine:
         AnalysisStage.CONCURRENCY_DETECTION,
     ]
 
+    # 阶段依赖 DAG (与各阶段 Prompt 模板 input_schema 中的 *_json 输入对应)
+    # 依赖全部完成的阶段会被并发执行
+    STAGE_DEPENDENCIES: Dict[AnalysisStage, Tuple[AnalysisStage, ...]] = {
+        AnalysisStage.PROJECT_UNDERSTANDING: (),
+        AnalysisStage.STRUCTURE_RECOGNITION: (
+            AnalysisStage.PROJECT_UNDERSTANDING,
+        ),
+        AnalysisStage.SEMANTIC_ANALYSIS: (
+            AnalysisStage.PROJECT_UNDERSTANDING,
+            AnalysisStage.STRUCTURE_RECOGNITION,
+        ),
+        AnalysisStage.EXECUTION_INFERENCE: (
+            AnalysisStage.PROJECT_UNDERSTANDING,
+            AnalysisStage.STRUCTURE_RECOGNITION,
+            AnalysisStage.SEMANTIC_ANALYSIS,
+        ),
+        AnalysisStage.CONCURRENCY_DETECTION: (
+            AnalysisStage.PROJECT_UNDERSTANDING,
+            AnalysisStage.STRUCTURE_RECOGNITION,
+            AnalysisStage.EXECUTION_INFERENCE,
+        ),
+    }
+
+    # 阶段系统提示词
+    SYSTEM_PROMPT = "You are an expert code analyzer. Respond with valid JSON only."
+
+    # 流式模式下逐个回调的数组
+    STREAM_ITEM_PATHS = ("code_structure.nodes", "code_structure.edges")
+
+    # 增量分析时重新执行的阶段 (其余阶段沿用基线任务结果)
+    INCREMENTAL_STAGES = (
+        AnalysisStage.STRUCTURE_RECOGNITION,
+        AnalysisStage.SEMANTIC_ANALYSIS,
+        AnalysisStage.EXECUTION_INFERENCE,
+    )
+
     def __init__(
         self,
         ai_adapter: BaseAIAdapter,
         prompts_dir: Optional[Path] = None,
-        validate_results: bool = True
+        validate_results: bool = True,
+        cache: Optional[StageResultCache] = None,
+        stream_stages: bool = False
     ):
         """
         初始化分析引擎
@@ -122,6 +182,8 @@ class AnalysisEngine:
             ai_adapter: AI 适配器实例
             prompts_dir: Prompt 模板目录 (可选)
             validate_results: 是否验证结果 (默认 True)
+            cache: 阶段结果缓存 (可选，None 表示不缓存)
+            stream_stages: 是否流式调用 AI 并增量解析 JSON (默认 False)
         """
         self.ai_adapter = ai_adapter
         self.prompt_manager = PromptTemplateManager(prompts_dir)
@@ -129,6 +191,8 @@ class AnalysisEngine:
         self.validator = ProtocolValidator() if validate_results else None
         self.serializer = ProtocolSerializer(validate_on_serialize=validate_results)
         self.validate_results = validate_results
+        self.cache = cache
+        self.stream_stages = stream_stages
 
         # 任务存储
         self.jobs: Dict[str, AnalysisJob] = {}
@@ -167,10 +231,57 @@ class AnalysisEngine:
         self.jobs[job.id] = job
         return job
 
+    async def create_incremental_job(
+        self,
+        previous_job_id: str,
+        changed_files: Optional[List[str]] = None,
+        force_full: bool = False
+    ) -> AnalysisJob:
+        """
+        创建增量分析任务
+
+        运行时会对比文件哈希找出变更文件 (并合并 changed_files)，
+        只对受影响文件及其图邻居重新执行 INCREMENTAL_STAGES。
+
+        Args:
+            previous_job_id: 基线任务 ID (必须已完成)
+            changed_files: 变更文件路径 (可选，绝对或相对路径)
+            force_full: 是否强制全量分析 (默认 False)
+
+        Returns:
+            AnalysisJob: 分析任务
+
+        Raises:
+            ValueError: 基线任务不存在
+            RuntimeError: 基线任务未完成
+        """
+        previous = self.jobs.get(previous_job_id)
+        if previous is None:
+            raise ValueError(f"Job not found: {previous_job_id}")
+
+        if previous.status != AnalysisStatus.COMPLETED or not previous.final_result:
+            raise RuntimeError(f"Base job not completed: {previous.status.value}")
+
+        job = await self.create_job(
+            previous.language,
+            previous.project_path,
+            previous.project_name
+        )
+
+        if not force_full:
+            job.base_job_id = previous.id
+            job.changed_files = [
+                normalize_file_path(path, previous.project_path)
+                for path in (changed_files or [])
+            ]
+
+        return job
+
     async def run_job(
         self,
         job_id: str,
-        progress_callback: Optional[ProgressCallback] = None
+        progress_callback: Optional[ProgressCallback] = None,
+        item_callback: Optional[StreamItemCallback] = None
     ) -> AnalysisJob:
         """
         执行分析任务
@@ -178,6 +289,7 @@ class AnalysisEngine:
         Args:
             job_id: 任务 ID
             progress_callback: 进度回调函数 (可选)
+            item_callback: 流式元素回调函数 (可选，仅 stream_stages 模式下调用)
 
         Returns:
             AnalysisJob: 完成的任务
@@ -199,47 +311,324 @@ class AnalysisEngine:
         job.started_at = datetime.now()
 
         try:
-            # 执行 5 阶段分析
-            for idx, stage in enumerate(self.STAGE_ORDER):
-                job.current_stage = stage
-
+            # 计算文件哈希 (增量分析基线和缓存键的一部分)
+            job.file_hashes = await asyncio.to_thread(compute_file_hashes, job.project_path)
+            job.project_hash = compute_project_hash(job.project_path, job.file_hashes)
+
+            stages = list(self.STAGE_ORDER)
+            base_job = None
+            if job.base_job_id is not None:
+                base_job = self._prepare_incremental(job)
+                stages = [s for s in stages if s in self.INCREMENTAL_STAGES]
+
+                # 没有受影响文件：直接沿用基线结果 (进度报告为最后一个增量阶段)
+                if not job.scope_files:
+                    job.stage_results.update(base_job.stage_results)
+                    job.current_stage = stages[-1]
+                    stages = []
+
+            # 按依赖 DAG 分批执行分析阶段
+            for batch in self._get_stage_batches(stages, done=set(job.stage_results)):
                 # 进度回调
-                if progress_callback:
-                    progress = (idx / len(self.STAGE_ORDER)) * 100
-                    progress_callback(job, stage, progress)
-
-                # 执行阶段
-                stage_result = await self._run_stage(job, stage)
-                job.stage_results[stage] = stage_result
+                for stage in batch:
+                    job.current_stage = stage
+                    if progress_callback:
+                        progress = (len(job.stage_results) / len(self.STAGE_ORDER)) * 100
+                        progress_callback(job, stage, progress)
+
+                # 并发执行同一批次的阶段
+                stage_results = await asyncio.gather(
+                    *(self._run_stage(job, stage, item_callback) for stage in batch)
+                )
+                for stage, stage_result in zip(batch, stage_results, strict=True):
+                    job.stage_results[stage] = stage_result
 
                 # 检查是否失败
-                if stage_result.status == AnalysisStatus.FAILED:
+                if any(r.status == AnalysisStatus.FAILED for r in stage_results):
                     job.status = AnalysisStatus.FAILED
                     job.completed_at = datetime.now()
                     return job
 
             # 合并结果
-            job.final_result = self._merge_results(job)
+            if base_job is not None:
+                job.final_result = merge_incremental_result(
+                    base_job.final_result or {},
+                    self._merge_results(job, stages) if stages else {},
+                    set(job.scope_files or ()),
+                    job.project_path
+                )
+            else:
+                job.final_result = self._merge_results(job)
 
             # 完成
             job.status = AnalysisStatus.COMPLETED
             job.completed_at = datetime.now()
 
             # 最终进度回调
-            if progress_callback:
+            if progress_callback and job.current_stage is not None:
                 progress_callback(job, job.current_stage, 100.0)
 
+        except asyncio.CancelledError:
+            # 任务被取消 (如 TaskQueue.cancel)：进行中的 AI 调用随之中止
+            job.status = AnalysisStatus.CANCELLED
+            job.completed_at = datetime.now()
+            raise
+
         except Exception as e:
             job.status = AnalysisStatus.FAILED
             job.completed_at = datetime.now()
             raise RuntimeError(f"Job execution failed: {e}") from e
 
+        finally:
+            self._flush_cache()
+
         return job
 
+    async def run_jobs_batch(
+        self,
+        job_ids: List[str],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[AnalysisJob]:
+        """
+        批处理模式执行多个分析任务 (离线批量分析，不要求交互延迟)
+
+        按依赖 DAG 分层推进所有任务：每一层把所有任务的阶段 Prompt 合并为一次
+        generate_batch 调用 (Claude 使用 Message Batches API)。
+        阶段失败的任务标记为 FAILED，不再参与后续各层。
+
+        Args:
+            job_ids: 任务 ID 列表 (不支持增量分析任务)
+            progress_callback: 进度回调函数 (可选)
+
+        Returns:
+            List[AnalysisJob]: 与 job_ids 顺序一致的任务
+
+        Raises:
+            ValueError: 任务不存在或是增量分析任务
+            RuntimeError: 任务已在运行或已完成
+        """
+        jobs = []
+        for job_id in job_ids:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise ValueError(f"Job not found: {job_id}")
+            if job.base_job_id is not None:
+                raise ValueError(f"Incremental job cannot run in batch mode: {job_id}")
+            if job.status in [AnalysisStatus.RUNNING, AnalysisStatus.COMPLETED]:
+                raise RuntimeError(f"Job already {job.status.value}: {job_id}")
+            jobs.append(job)
+
+        for job in jobs:
+            job.status = AnalysisStatus.RUNNING
+            job.started_at = datetime.now()
+
+        try:
+            for job in jobs:
+                job.file_hashes = await asyncio.to_thread(compute_file_hashes, job.project_path)
+                job.project_hash = compute_project_hash(job.project_path, job.file_hashes)
+
+            active = list(jobs)
+            for batch in self._get_stage_batches():
+                pending = [(job, stage) for job in active for stage in batch]
+                for job, stage in pending:
+                    job.current_stage = stage
+                    if progress_callback:
+                        progress = (len(job.stage_results) / len(self.STAGE_ORDER)) * 100
+                        progress_callback(job, stage, progress)
+
+                stage_results = await self._run_stages_batch(pending)
+
+                failed = set()
+                for (job, stage), stage_result in zip(pending, stage_results, strict=True):
+                    job.stage_results[stage] = stage_result
+                    if stage_result.status == AnalysisStatus.FAILED:
+                        failed.add(job.id)
+
+                for job in active:
+                    if job.id in failed:
+                        job.status = AnalysisStatus.FAILED
+                        job.completed_at = datetime.now()
+                active = [job for job in active if job.id not in failed]
+
+            for job in active:
+                job.final_result = self._merge_results(job)
+                job.status = AnalysisStatus.COMPLETED
+                job.completed_at = datetime.now()
+                if progress_callback and job.current_stage is not None:
+                    progress_callback(job, job.current_stage, 100.0)
+
+        except asyncio.CancelledError:
+            for job in jobs:
+                if job.status == AnalysisStatus.RUNNING:
+                    job.status = AnalysisStatus.CANCELLED
+                    job.completed_at = datetime.now()
+            raise
+
+        except Exception as e:
+            for job in jobs:
+                if job.status == AnalysisStatus.RUNNING:
+                    job.status = AnalysisStatus.FAILED
+                    job.completed_at = datetime.now()
+            raise RuntimeError(f"Batch execution failed: {e}") from e
+
+        finally:
+            self._flush_cache()
+
+        return jobs
+
+    async def _run_stages_batch(
+        self,
+        pending: List[Tuple[AnalysisJob, AnalysisStage]]
+    ) -> List[StageResult]:
+        """
+        通过一次批量生成执行多个 (任务, 阶段)
+
+        命中结果缓存或准备输入失败的阶段不进入批处理。
+
+        Args:
+            pending: (任务, 阶段) 列表
+
+        Returns:
+            List[StageResult]: 与 pending 顺序一致的阶段结果
+        """
+        results = []
+        requests = []
+        waiting: Dict[str, Tuple[AnalysisJob, AnalysisStage, StageResult, Optional[str]]] = {}
+
+        for index, (job, stage) in enumerate(pending):
+            result = StageResult(
+                stage=stage,
+                status=AnalysisStatus.RUNNING,
+                started_at=datetime.now()
+            )
+            results.append(result)
+
+            try:
+                input_data = self._prepare_stage_input(job, stage)
+                cache_key = self._get_cache_key(job, stage, input_data)
+                if self._load_cached_result(cache_key, result):
+                    continue
+
+                rendered_prompt = self.prompt_renderer.render_split(
+                    language=job.language,
+                    stage=stage.value,
+                    input_data=input_data,
+                    validate_input=True
+                )
+            except Exception as e:
+                result.status = AnalysisStatus.FAILED
+                result.error = str(e)
+                result.completed_at = datetime.now()
+                continue
+
+            custom_id = f"req-{index}"
+            requests.append(BatchRequest(
+                custom_id=custom_id,
+                prompt=rendered_prompt.prompt,
+                system_prompt=self.SYSTEM_PROMPT,
+                context_blocks=rendered_prompt.context_blocks,
+            ))
+            waiting[custom_id] = (job, stage, result, cache_key)
+
+        if not requests:
+            return results
+
+        for batch_result in await self.ai_adapter.generate_batch(requests):
+            job, stage, result, cache_key = waiting[batch_result.custom_id]
+            result.ai_response = batch_result.response
+
+            try:
+                if batch_result.response is None:
+                    raise RuntimeError(batch_result.error or "No response")
+                try:
+                    stage_data = json.loads(batch_result.response.content)
+                except json.JSONDecodeError as e:
+                    result.status = AnalysisStatus.FAILED
+                    result.error = f"Invalid JSON response: {e}"
+                    result.completed_at = datetime.now()
+                    continue
+
+                self._complete_stage(job, stage, result, stage_data, cache_key)
+
+            except Exception as e:
+                result.status = AnalysisStatus.FAILED
+                result.error = str(e)
+                result.completed_at = datetime.now()
+
+        return results
+
+    def _prepare_incremental(self, job: AnalysisJob) -> AnalysisJob:
+        """
+        准备增量分析：计算分析范围并沿用基线任务中不需要重跑的阶段结果
+
+        Args:
+            job: 增量分析任务 (已计算 file_hashes)
+
+        Returns:
+            AnalysisJob: 基线任务
+        """
+        base_job = self.jobs.get(job.base_job_id) if job.base_job_id else None
+        if base_job is None or not base_job.final_result:
+            raise RuntimeError(f"Base job not available: {job.base_job_id}")
+
+        changed = diff_file_hashes(base_job.file_hashes, job.file_hashes)
+        changed.update(job.changed_files)
+
+        job.scope_files = sorted(
+            find_affected_files(base_job.final_result, changed, job.project_path)
+        )
+
+        for stage, stage_result in base_job.stage_results.items():
+            if stage not in self.INCREMENTAL_STAGES:
+                job.stage_results[stage] = stage_result
+
+        return base_job
+
+    def _get_stage_batches(
+        self,
+        stages: Optional[List[AnalysisStage]] = None,
+        done: Optional[Set[AnalysisStage]] = None
+    ) -> List[List[AnalysisStage]]:
+        """
+        按依赖 DAG 对阶段进行拓扑分层
+
+        同一批次内的阶段互不依赖，可以并发执行；批次内保持 STAGE_ORDER 顺序。
+
+        Args:
+            stages: 需要执行的阶段 (默认 STAGE_ORDER)
+            done: 已有结果的阶段 (视为依赖已满足)
+
+        Returns:
+            List[List[AnalysisStage]]: 分层后的阶段批次
+
+        Raises:
+            ValueError: 依赖关系存在环或引用了未知阶段
+        """
+        done = set(done or ())
+        remaining = list(self.STAGE_ORDER if stages is None else stages)
+        batches = []
+
+        while remaining:
+            batch = [
+                stage for stage in remaining
+                if all(dep in done for dep in self.STAGE_DEPENDENCIES.get(stage, ()))
+            ]
+            if not batch:
+                raise ValueError(
+                    f"Unresolvable stage dependencies: {[s.value for s in remaining]}"
+                )
+
+            batches.append(batch)
+            done.update(batch)
+            remaining = [stage for stage in remaining if stage not in done]
+
+        return batches
+
     async def _run_stage(
         self,
         job: AnalysisJob,
-        stage: AnalysisStage
+        stage: AnalysisStage,
+        item_callback: Optional[StreamItemCallback] = None
     ) -> StageResult:
         """
         执行单个分析阶段
@@ -247,6 +636,7 @@ class AnalysisEngine:
         Args:
             job: 分析任务
             stage: 分析阶段
+            item_callback: 流式元素回调函数 (可选)
 
         Returns:
             StageResult: 阶段结果
@@ -261,45 +651,40 @@ class AnalysisEngine:
             # 1. 准备输入数据
             input_data = self._prepare_stage_input(job, stage)
 
-            # 2. 加载和渲染 Prompt
-            rendered_prompt = self.prompt_renderer.render(
+            # 查询结果缓存
+            cache_key = self._get_cache_key(job, stage, input_data)
+            if self._load_cached_result(cache_key, result):
+                return result
+
+            # 2. 加载和渲染 Prompt (共享上下文拆分为可缓存的前缀)
+            rendered_prompt = self.prompt_renderer.render_split(
                 language=job.language,
                 stage=stage.value,
                 input_data=input_data,
                 validate_input=True
             )
 
-            # 3. 调用 AI
-            ai_response = await self.ai_adapter.generate_with_retry(
-                prompt=rendered_prompt,
-                system_prompt="You are an expert code analyzer. Respond with valid JSON only."
-            )
-            result.ai_response = ai_response
-
-            # 4. 解析 JSON 响应
+            # 3. 调用 AI 并解析 JSON 响应 (流式模式下输出格式错误时立即中止)
             try:
-                stage_data = json.loads(ai_response.content)
-            except json.JSONDecodeError as e:
+                if self.stream_stages:
+                    stage_data, result.ai_response = await self._generate_streaming(
+                        job, stage, rendered_prompt, item_callback
+                    )
+                else:
+                    result.ai_response = await self.ai_adapter.generate_with_retry(
+                        prompt=rendered_prompt.prompt,
+                        system_prompt=self.SYSTEM_PROMPT,
+                        context_blocks=rendered_prompt.context_blocks
+                    )
+                    stage_data = json.loads(result.ai_response.content)
+            except (json.JSONDecodeError, StreamingJSONError) as e:
                 result.status = AnalysisStatus.FAILED
                 result.error = f"Invalid JSON response: {e}"
                 result.completed_at = datetime.now()
                 return result
 
-            # 5. 验证结果
-            if self.validate_results:
-                validation_result = self.validator.validate_complete(stage_data)
-                result.validation_result = validation_result
-
-                if not validation_result.is_valid:
-                    result.status = AnalysisStatus.FAILED
-                    result.error = f"Validation failed: {validation_result.errors}"
-                    result.completed_at = datetime.now()
-                    return result
-
-            # 6. 保存结果
-            result.data = stage_data
-            result.status = AnalysisStatus.COMPLETED
-            result.completed_at = datetime.now()
+            # 4. 验证并保存结果
+            self._complete_stage(job, stage, result, stage_data, cache_key)
 
         except Exception as e:
             result.status = AnalysisStatus.FAILED
@@ -308,6 +693,183 @@ class AnalysisEngine:
 
         return result
 
+    def _load_cached_result(self, cache_key: Optional[str], result: StageResult) -> bool:
+        """
+        从结果缓存填充阶段结果
+
+        Args:
+            cache_key: 缓存键 (None 表示不缓存)
+            result: 阶段结果
+
+        Returns:
+            bool: 是否命中缓存
+        """
+        if cache_key is None or self.cache is None:
+            return False
+
+        try:
+            cached_data = self.cache.get(cache_key)
+        except CacheError:
+            # 缓存读取失败按未命中处理
+            return False
+        if cached_data is None:
+            return False
+
+        result.data = cached_data
+        result.status = AnalysisStatus.COMPLETED
+        result.cache_hit = True
+        result.completed_at = datetime.now()
+        return True
+
+    def _complete_stage(
+        self,
+        job: AnalysisJob,
+        stage: AnalysisStage,
+        result: StageResult,
+        stage_data: Dict[str, Any],
+        cache_key: Optional[str]
+    ) -> None:
+        """
+        验证阶段数据，保存到阶段结果并写入结果缓存
+
+        Args:
+            job: 分析任务
+            stage: 分析阶段
+            result: 阶段结果
+            stage_data: 解析后的阶段数据
+            cache_key: 缓存键 (None 表示不缓存)
+        """
+        # 验证结果
+        if self.validate_results:
+            validation_result = self.validator.validate_complete(stage_data)
+            result.validation_result = validation_result
+
+            if not validation_result.is_valid:
+                result.status = AnalysisStatus.FAILED
+                result.error = f"Validation failed: {validation_result.errors}"
+                result.completed_at = datetime.now()
+                return
+
+        # 保存结果
+        result.data = stage_data
+        result.status = AnalysisStatus.COMPLETED
+        result.completed_at = datetime.now()
+
+        if cache_key is not None and self.cache is not None:
+            template_info = self.prompt_manager.get_template_info(job.language, stage.value)
+            try:
+                self.cache.put(
+                    cache_key,
+                    stage_data,
+                    project_hash=job.project_hash or "",
+                    stage=stage.value,
+                    template_id=template_info.id,
+                    template_version=template_info.version,
+                    model=self.ai_adapter.get_model_name(),
+                )
+            except CacheError:
+                # 缓存写入失败不影响分析结果
+                pass
+
+    def _flush_cache(self) -> None:
+        """将结果缓存的 LRU 顺序和命中次数落盘，失败时忽略 (内部使用)"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.flush()
+        except CacheError:
+            # 缓存写入失败不影响分析结果
+            pass
+
+    async def _generate_streaming(
+        self,
+        job: AnalysisJob,
+        stage: AnalysisStage,
+        prompt: RenderedPrompt,
+        item_callback: Optional[StreamItemCallback] = None
+    ) -> Tuple[Any, AIResponse]:
+        """
+        流式调用 AI 并增量解析 JSON
+
+        STREAM_ITEM_PATHS 中的元素一完整就交给 item_callback；
+        输出格式错误时抛出 StreamingJSONError 并关闭流 (不再等待剩余输出)。
+
+        Args:
+            job: 分析任务
+            stage: 分析阶段
+            prompt: 渲染后的 Prompt (共享上下文块 + 阶段 Prompt)
+            item_callback: 流式元素回调函数 (可选)
+
+        Returns:
+            Tuple[Any, AIResponse]: (解析后的阶段数据, AI 响应)
+        """
+        start_time = time.time()
+        parser = IncrementalJSONParser(self.STREAM_ITEM_PATHS)
+        chunks: List[str] = []
+
+        stream = self.ai_adapter.generate_stream_limited(
+            prompt=prompt.prompt,
+            system_prompt=self.SYSTEM_PROMPT,
+            context_blocks=prompt.context_blocks
+        )
+        async with aclosing(stream):
+            async for chunk in stream:
+                chunks.append(chunk)
+                for path, item in parser.feed(chunk):
+                    if item_callback:
+                        item_callback(job, stage, path, item)
+
+        stage_data = parser.close()
+        content = "".join(chunks)
+
+        # 流式响应没有用量信息，按文本估算
+        prompt_tokens = estimate_tokens(prompt.text) + estimate_tokens(self.SYSTEM_PROMPT)
+        completion_tokens = estimate_tokens(content)
+        ai_response = AIResponse(
+            content=content,
+            model=self.ai_adapter.get_model_name(),
+            usage=TokenUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+            finish_reason="stop",
+            response_time=time.time() - start_time,
+            created_at=datetime.now(),
+            metadata={"streamed": True},
+        )
+        return stage_data, ai_response
+
+    def _get_cache_key(
+        self,
+        job: AnalysisJob,
+        stage: AnalysisStage,
+        input_data: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        计算阶段结果缓存键
+
+        Args:
+            job: 分析任务
+            stage: 分析阶段
+            input_data: 阶段输入数据
+
+        Returns:
+            Optional[str]: 缓存键，未启用缓存时返回 None
+        """
+        if self.cache is None:
+            return None
+
+        template_info = self.prompt_manager.get_template_info(job.language, stage.value)
+        return StageResultCache.make_key(
+            input_data,
+            template_id=template_info.id,
+            template_version=template_info.version,
+            model=self.ai_adapter.get_model_name(),
+            temperature=self.ai_adapter.config.temperature,
+            project_hash=job.project_hash or "",
+        )
+
     def _prepare_stage_input(
         self,
         job: AnalysisJob,
@@ -323,7 +885,7 @@ class AnalysisEngine:
         Returns:
             Dict[str, Any]: 输入数据
         """
-        input_data = {
+        input_data: Dict[str, Any] = {
             "project_path": str(job.project_path),
             "project_name": job.project_name,
         }
@@ -365,8 +927,33 @@ class AnalysisEngine:
 
         # 其他阶段类似...
 
+        # 增量分析：只提供受影响的源文件
+        if job.scope_files is not None and stage in self.INCREMENTAL_STAGES:
+            input_data["source_files"] = self._read_source_files(job)
+
         return input_data
 
+    def _read_source_files(self, job: AnalysisJob) -> List[Dict[str, str]]:
+        """
+        读取增量分析范围内的源文件 (已删除的文件跳过)
+
+        Args:
+            job: 分析任务
+
+        Returns:
+            List[Dict[str, str]]: [{"path": ..., "content": ...}]
+        """
+        source_files = []
+        for rel_path in job.scope_files or []:
+            file_path = job.project_path / rel_path
+            if not file_path.is_file():
+                continue
+            source_files.append({
+                "path": rel_path,
+                "content": file_path.read_text(encoding="utf-8", errors="replace"),
+            })
+        return source_files
+
     def _get_file_tree(self, project_path: Path, max_depth: int = 3) -> str:
         """
         获取项目文件树
@@ -398,12 +985,17 @@ class AnalysisEngine:
         walk(project_path)
         return "\n".join(lines)
 
-    def _merge_results(self, job: AnalysisJob) -> Dict[str, Any]:
+    def _merge_results(
+        self,
+        job: AnalysisJob,
+        stages: Optional[List[AnalysisStage]] = None
+    ) -> Dict[str, Any]:
         """
         合并所有阶段结果
 
         Args:
             job: 分析任务
+            stages: 参与合并的阶段 (默认 STAGE_ORDER)
 
         Returns:
             Dict[str, Any]: 完整的分析结果
@@ -416,7 +1008,7 @@ class AnalysisEngine:
             "execution_trace": {"traceable_units": []},
         }
 
-        for stage in self.STAGE_ORDER:
+        for stage in (self.STAGE_ORDER if stages is None else stages):
             stage_result = job.stage_results.get(stage)
             if stage_result and stage_result.data:
                 merged.update(stage_result.data)
@@ -0,0 +1,182 @@
+"""
+AIFlow Incremental Analysis
+增量分析 - 变更检测、影响范围计算和结果合并
+
+核心功能:
+1. 对比前后两次分析的文件内容哈希，找出变更文件
+2. 基于 code_structure 图计算受影响文件 (变更文件 + 图邻居)
+3. 将增量分析结果合并进上一次的 final_result
+"""
+
+import copy
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+def normalize_file_path(file_path: str, project_path: Path) -> str:
+    """
+    将文件路径规范化为相对项目根目录的 POSIX 路径
+
+    Args:
+        file_path: 文件路径 (绝对或相对)
+        project_path: 项目路径
+
+    Returns:
+        str: 相对路径
+    """
+    path = Path(file_path)
+    if path.is_absolute():
+        try:
+            path = path.relative_to(project_path)
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def diff_file_hashes(
+    old_hashes: Dict[str, str],
+    new_hashes: Dict[str, str]
+) -> Set[str]:
+    """
+    对比文件哈希，返回新增、删除和修改的文件
+
+    Args:
+        old_hashes: 上一次分析的文件哈希
+        new_hashes: 当前的文件哈希
+
+    Returns:
+        Set[str]: 变更文件相对路径集合
+    """
+    changed = {path for path, digest in new_hashes.items() if old_hashes.get(path) != digest}
+    changed.update(path for path in old_hashes if path not in new_hashes)
+    return changed
+
+
+def _node_file(node: Dict[str, Any], project_path: Path) -> Optional[str]:
+    """读取节点所在文件 (内部使用)"""
+    location = (node.get("metadata") or {}).get("code_location") or {}
+    file_path = location.get("file_path")
+    if not file_path:
+        return None
+    return normalize_file_path(file_path, project_path)
+
+
+def find_affected_files(
+    final_result: Dict[str, Any],
+    changed_files: Iterable[str],
+    project_path: Path
+) -> Set[str]:
+    """
+    计算受影响文件：变更文件 + 在 code_structure 图中与其相邻的节点所在文件
+
+    Args:
+        final_result: 上一次的完整分析结果
+        changed_files: 变更文件相对路径
+        project_path: 项目路径
+
+    Returns:
+        Set[str]: 受影响文件相对路径集合
+    """
+    affected = set(changed_files)
+    code_structure = final_result.get("code_structure", {})
+
+    node_files: Dict[str, str] = {}
+    for node in code_structure.get("nodes", []):
+        file_path = _node_file(node, project_path)
+        if file_path:
+            node_files[node["id"]] = file_path
+
+    changed_nodes = {node_id for node_id, path in node_files.items() if path in affected}
+
+    for edge in code_structure.get("edges", []):
+        source, target = edge.get("source"), edge.get("target")
+        if source in changed_nodes and target in node_files:
+            affected.add(node_files[target])
+        elif target in changed_nodes and source in node_files:
+            affected.add(node_files[source])
+
+    return affected
+
+
+def _merge_by_id(
+    base: List[Dict[str, Any]],
+    updates: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """按 id 合并列表，updates 覆盖同 id 元素 (内部使用)"""
+    merged = {item["id"]: item for item in base}
+    for item in updates:
+        merged[item["id"]] = item
+    return list(merged.values())
+
+
+def merge_incremental_result(
+    previous: Dict[str, Any],
+    partial: Dict[str, Any],
+    affected_files: Set[str],
+    project_path: Path
+) -> Dict[str, Any]:
+    """
+    将增量分析结果合并进上一次的完整结果
+
+    规则:
+    - 移除受影响文件中的旧节点，以及端点被移除的边
+    - 加入增量结果中的节点和边 (同 id 覆盖)，丢弃悬空的边
+    - launch_buttons 按 node_id 同步清理，traceable_units 按 name 覆盖
+    - project_metadata / concurrency_info 沿用上一次结果
+
+    Args:
+        previous: 上一次的完整分析结果
+        partial: 增量阶段的合并结果
+        affected_files: 受影响文件相对路径集合
+        project_path: 项目路径
+
+    Returns:
+        Dict[str, Any]: 合并后的完整结果
+    """
+    merged = copy.deepcopy(previous)
+
+    # 1. 代码结构
+    old_structure = merged.setdefault("code_structure", {"nodes": [], "edges": []})
+    new_structure = partial.get("code_structure") or {}
+
+    removed_ids = {
+        node["id"] for node in old_structure.get("nodes", [])
+        if _node_file(node, project_path) in affected_files
+    }
+    nodes = _merge_by_id(
+        [n for n in old_structure.get("nodes", []) if n["id"] not in removed_ids],
+        new_structure.get("nodes", [])
+    )
+    node_ids = {node["id"] for node in nodes}
+
+    edges = _merge_by_id(
+        [
+            e for e in old_structure.get("edges", [])
+            if e["source"] not in removed_ids and e["target"] not in removed_ids
+        ],
+        new_structure.get("edges", [])
+    )
+    old_structure["nodes"] = nodes
+    old_structure["edges"] = [
+        e for e in edges if e["source"] in node_ids and e["target"] in node_ids
+    ]
+
+    # 2. 行为元数据
+    new_buttons = (partial.get("behavior_metadata") or {}).get("launch_buttons", [])
+    if "behavior_metadata" in merged or new_buttons:
+        behavior = merged.setdefault("behavior_metadata", {})
+        behavior["launch_buttons"] = [
+            b for b in _merge_by_id(behavior.get("launch_buttons", []), new_buttons)
+            if b["node_id"] in node_ids
+        ]
+
+    # 3. 执行追踪
+    new_units = (partial.get("execution_trace") or {}).get("traceable_units", [])
+    trace = merged.setdefault("execution_trace", {"traceable_units": []})
+    replaced_names = {unit["name"] for unit in new_units}
+    trace["traceable_units"] = [
+        unit for unit in trace.get("traceable_units", [])
+        if unit["name"] not in replaced_names
+    ] + new_units
+
+    return merged
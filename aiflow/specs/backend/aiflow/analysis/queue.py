@@ -5,20 +5,34 @@ AIFlow Analysis Task Queue
 核心功能:
 1. 异步任务队列
 2. 并发控制 (最大并发任务数)
-3. 优先级队列
+3. 优先级调度 (单堆 + 优先级老化 + 按提交方加权公平排队)
 4. 任务取消和超时
-5. 任务状态追踪
+5. 任务状态追踪 (O(1) 统计 + 有界历史)
 """
 
 import asyncio
-from collections import deque
-from dataclasses import dataclass
+import heapq
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Deque, Dict, Optional, Set
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
 
+class TaskEvictedError(ValueError):
+    """任务已结束且已从历史中淘汰，且无法从落盘记录恢复 (只保留最终状态)"""
+
+    def __init__(self, task_id: str, state: "TaskState"):
+        super().__init__(f"Task evicted from history: {task_id} ({state.value})")
+        self.task_id = task_id
+        self.state = state
+
+
 class TaskPriority(Enum):
     """任务优先级"""
     LOW = 0
@@ -53,6 +67,8 @@ class QueueTask:
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     timeout: Optional[float] = None  # 超时时间(秒)
+    tenant: str = "default"  # 提交方 (项目或用户)，用于公平排队
+    done_future: Optional[asyncio.Future] = field(default=None, repr=False)  # 结束时完成
 
     def __post_init__(self):
         if self.created_at is None:
@@ -66,20 +82,116 @@ class QueueTask:
         return None
 
     @property
-    def waiting_time(self) -> Optional[float]:
+    def waiting_time(self) -> float:
         """计算等待时长（秒）"""
         if self.started_at:
             return (self.started_at - self.created_at).total_seconds()
         return (datetime.now() - self.created_at).total_seconds()
 
 
+def _spilled_task_func() -> None:
+    """从落盘记录恢复的任务的占位函数 (不可再执行)"""
+    raise RuntimeError("Task restored from history spill cannot be executed")
+
+
+class LatencyHistogram:
+    """流式延迟直方图 (对数分桶，分位数相对误差不超过 growth - 1)"""
+
+    def __init__(
+        self,
+        min_value: float = 1e-4,
+        max_value: float = 3600.0,
+        growth: float = 1.1
+    ):
+        """
+        初始化直方图
+
+        Args:
+            min_value: 最小分辨值(秒) (默认 0.1ms)
+            max_value: 最大分辨值(秒) (默认 1 小时，更大的值落入最后一个桶)
+            growth: 相邻桶的比例 (默认 1.1)
+        """
+        self.min_value = min_value
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.counts = [0] * (int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """记录一个样本"""
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = int(math.log(value / self.min_value) / self._log_growth) + 1
+            index = min(index, len(self.counts) - 1)
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        """平均值"""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """
+        计算分位数 (返回所在桶的上界，不超过最大样本)
+
+        Args:
+            pct: 百分位 (0-100)
+
+        Returns:
+            float: 分位数值(秒)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(self.count * pct / 100))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(self.min_value * self.growth ** index, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        """转换为字典"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
 class TaskQueue:
-    """分析任务队列"""
+    """
+    分析任务队列
+
+    调度规则 (虚拟时钟):
+    - 每个任务入队时得到一个调度键 start_tag - priority * aging_interval，堆顶最先执行
+    - start_tag = max(当前时间, 该提交方上一个任务的 finish_tag)，
+      finish_tag = start_tag + fair_share_quantum / 提交方权重
+    - 同一提交方的积压任务依次后移，其它提交方的新任务可以插队 (加权公平)
+    - 低优先级任务等待超过 aging_interval * 优先级差 后会排到新提交的高优先级任务之前 (老化)
+    """
 
     def __init__(
         self,
         max_concurrent: int = 5,
-        max_queue_size: int = 1000
+        max_queue_size: int = 1000,
+        aging_interval: float = 30.0,
+        fair_share_quantum: float = 1.0,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        max_history: int = 10000,
+        history_spill_path: Optional[Path] = None,
+        max_evicted_states: int = 100000
     ):
         """
         初始化任务队列
@@ -87,25 +199,59 @@ class TaskQueue:
         Args:
             max_concurrent: 最大并发任务数 (默认 5)
             max_queue_size: 最大队列大小 (默认 1000)
+            aging_interval: 每提升一级优先级等效的等待时间(秒) (默认 30)
+            fair_share_quantum: 每个任务占用的虚拟时间(秒) (默认 1)
+            tenant_weights: 提交方权重 (可选，默认 1.0)
+            max_history: 保留的已结束任务数 (默认 10000，超出后淘汰最早结束的)
+            history_spill_path: 被淘汰任务的摘要追加写入的 JSONL 文件 (可选，
+                wait_for_task 可据此返回被淘汰的任务)
+            max_evicted_states: 被淘汰任务保留最终状态的数量 (默认 100000)
         """
         self.max_concurrent = max_concurrent
         self.max_queue_size = max_queue_size
-
-        # 任务存储
+        self.aging_interval = aging_interval
+        self.fair_share_quantum = fair_share_quantum
+        self.tenant_weights: Dict[str, float] = dict(tenant_weights or {})
+        self.max_history = max_history
+        self.history_spill_path = Path(history_spill_path) if history_spill_path else None
+        self.max_evicted_states = max_evicted_states
+
+        # 任务存储 (未结束任务 + 有界的已结束任务历史)
         self.tasks: Dict[str, QueueTask] = {}
-
-        # 优先级队列 (使用 deque 实现)
-        self.queues: Dict[TaskPriority, Deque[str]] = {
-            priority: deque() for priority in TaskPriority
-        }
-
-        # 正在运行的任务
+        self._history: "OrderedDict[str, None]" = OrderedDict()
+        # 已淘汰任务 ID → (最终状态, 落盘记录偏移)，wait_for_task 据此恢复任务或区分 "已结束" 和 "不存在"
+        self._evicted_states: "OrderedDict[str, Tuple[TaskState, Optional[int]]]" = OrderedDict()
+
+        # 统计 (随状态转换增量更新)
+        self.total_submitted = 0
+        self.state_counts: Dict[TaskState, int] = dict.fromkeys(TaskState, 0)
+        self.wait_time_histogram = LatencyHistogram()
+        self.run_time_histogram = LatencyHistogram()
+        self._completed_wait_total = 0.0
+        self._completed_run_total = 0.0
+
+        # 调度堆: (调度键, 序号, 任务 ID)；取消的任务惰性删除
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        # 提交方虚拟完成时间 / 等待中任务数；空闲且不超前的提交方会被清理
+        self._tenant_finish: Dict[str, float] = {}
+        self._tenant_pending: Dict[str, int] = {}
+        self._tenant_prune_at = 64
+
+        # 等待中任务计数 (按优先级)
+        self.pending_by_priority: Dict[TaskPriority, int] = dict.fromkeys(TaskPriority, 0)
+
+        # 正在运行的任务 (及其 asyncio.Task，用于取消)
         self.running_tasks: Set[str] = set()
+        self._running_handles: Dict[str, asyncio.Task] = {}
 
         # 事件循环
         self._worker_task: Optional[asyncio.Task] = None
         self._shutdown_event = asyncio.Event()
 
+        # 有新任务入队、任务结束或关闭时通知 worker
+        self._condition = asyncio.Condition()
+
     async def start(self) -> None:
         """启动队列处理器"""
         if self._worker_task is not None:
@@ -124,8 +270,10 @@ class TaskQueue:
         if self._worker_task is None:
             return
 
-        # 设置关闭事件
+        # 设置关闭事件并唤醒 worker
         self._shutdown_event.set()
+        async with self._condition:
+            self._condition.notify_all()
 
         # 等待 worker 完成
         try:
@@ -150,6 +298,7 @@ class TaskQueue:
         name: Optional[str] = None,
         priority: TaskPriority = TaskPriority.NORMAL,
         timeout: Optional[float] = None,
+        tenant: str = "default",
         **kwargs: Any
     ) -> str:
         """
@@ -161,6 +310,7 @@ class TaskQueue:
             name: 任务名称 (可选)
             priority: 任务优先级 (默认 NORMAL)
             timeout: 超时时间(秒) (可选)
+            tenant: 提交方 (项目或用户，默认 "default")
             **kwargs: 函数关键字参数
 
         Returns:
@@ -170,8 +320,7 @@ class TaskQueue:
             RuntimeError: 队列已满
         """
         # 检查队列大小
-        total_queued = sum(len(q) for q in self.queues.values())
-        if total_queued >= self.max_queue_size:
+        if self.pending_count >= self.max_queue_size:
             raise RuntimeError(f"Queue is full (max: {self.max_queue_size})")
 
         # 创建任务
@@ -185,13 +334,19 @@ class TaskQueue:
             priority=priority,
             state=TaskState.PENDING,
             timeout=timeout,
+            tenant=tenant,
+            done_future=asyncio.get_running_loop().create_future(),
         )
 
         # 保存任务
         self.tasks[task_id] = task
+        self.total_submitted += 1
+        self.state_counts[TaskState.PENDING] += 1
 
-        # 加入对应优先级队列
-        self.queues[priority].append(task_id)
+        # 加入调度堆并唤醒 worker
+        async with self._condition:
+            self._enqueue(task)
+            self._condition.notify()
 
         return task_id
 
@@ -199,6 +354,9 @@ class TaskQueue:
         """
         取消任务
 
+        运行中的任务会被真正取消 (CancelledError 传递到正在等待的 AI 调用)，
+        并立即释放并发槽位。
+
         Args:
             task_id: 任务 ID
 
@@ -215,14 +373,25 @@ class TaskQueue:
             return False
 
         if task.state == TaskState.PENDING:
-            # 从队列中移除
-            try:
-                self.queues[task.priority].remove(task_id)
-            except ValueError:
-                pass
+            # 堆中条目在出队时跳过
+            self._dequeued(task)
+            self._set_state(task, TaskState.CANCELLED)
+            task.completed_at = datetime.now()
+            self._finish_task(task)
+        else:
+            self._set_state(task, TaskState.CANCELLED)
+            task.completed_at = datetime.now()
+
+            handle = self._running_handles.pop(task_id, None)
+            if handle is not None:
+                handle.cancel()
+
+            # 立即释放并发槽位并唤醒 worker
+            async with self._condition:
+                self.running_tasks.discard(task_id)
+                self._condition.notify()
 
-        task.state = TaskState.CANCELLED
-        task.completed_at = datetime.now()
+            self._finish_task(task)
 
         return True
 
@@ -238,6 +407,9 @@ class TaskQueue:
         """
         等待任务完成
 
+        已从有界历史中淘汰的任务: 启用 history_spill_path 时从落盘记录恢复 (result 只保留
+        可 JSON 序列化的值，error 恢复为 Exception(消息))；未启用时需在淘汰前取走结果。
+
         Args:
             task_id: 任务 ID
             timeout: 超时时间(秒)
@@ -246,114 +418,303 @@ class TaskQueue:
             QueueTask: 完成的任务
 
         Raises:
+            TaskEvictedError: 任务已被淘汰且无法从落盘记录恢复 (state 为最终状态)
             ValueError: 任务不存在
             asyncio.TimeoutError: 等待超时
         """
         if task_id not in self.tasks:
-            raise ValueError(f"Task not found: {task_id}")
+            evicted = self._evicted_states.get(task_id)
+            if evicted is None:
+                raise ValueError(f"Task not found: {task_id}")
 
-        task = self.tasks[task_id]
-        start_time = asyncio.get_event_loop().time()
+            state, offset = evicted
+            if self.history_spill_path is not None and offset is not None:
+                restored = self._load_spilled_task(task_id, self.history_spill_path, offset)
+                if restored is not None:
+                    return restored
+            raise TaskEvictedError(task_id, state)
 
-        # 轮询任务状态
-        while task.state in [TaskState.PENDING, TaskState.RUNNING]:
-            if timeout is not None:
-                elapsed = asyncio.get_event_loop().time() - start_time
-                if elapsed >= timeout:
-                    raise asyncio.TimeoutError(
-                        f"Waiting for task {task_id} timed out"
-                    )
+        task = self.tasks[task_id]
 
-            await asyncio.sleep(0.1)
+        # 等待任务结束通知 (shield: 等待超时不影响任务本身)
+        if task.done_future is not None and task.state in [TaskState.PENDING, TaskState.RUNNING]:
+            try:
+                await asyncio.wait_for(asyncio.shield(task.done_future), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(
+                    f"Waiting for task {task_id} timed out"
+                ) from None
 
         return task
 
     def get_stats(self) -> Dict[str, Any]:
-        """获取队列统计信息"""
+        """获取队列统计信息 (O(1)，不遍历任务)"""
         stats = {
-            "total_tasks": len(self.tasks),
+            "total_tasks": self.total_submitted,
             "running": len(self.running_tasks),
-            "pending": sum(len(q) for q in self.queues.values()),
-            "completed": sum(1 for t in self.tasks.values() if t.state == TaskState.COMPLETED),
-            "failed": sum(1 for t in self.tasks.values() if t.state == TaskState.FAILED),
-            "cancelled": sum(1 for t in self.tasks.values() if t.state == TaskState.CANCELLED),
-            "timeout": sum(1 for t in self.tasks.values() if t.state == TaskState.TIMEOUT),
+            "pending": self.pending_count,
+            "completed": self.state_counts[TaskState.COMPLETED],
+            "failed": self.state_counts[TaskState.FAILED],
+            "cancelled": self.state_counts[TaskState.CANCELLED],
+            "timeout": self.state_counts[TaskState.TIMEOUT],
             "max_concurrent": self.max_concurrent,
             "queue_by_priority": {
-                priority.name: len(queue)
-                for priority, queue in self.queues.items()
+                priority.name: count
+                for priority, count in self.pending_by_priority.items()
             },
+            "history_size": len(self._history),
+            "wait_time": self.wait_time_histogram.to_dict(),
+            "run_time": self.run_time_histogram.to_dict(),
         }
 
-        # 计算平均等待时间和执行时间
-        completed_tasks = [t for t in self.tasks.values() if t.state == TaskState.COMPLETED]
-        if completed_tasks:
-            stats["avg_waiting_time"] = sum(t.waiting_time or 0 for t in completed_tasks) / len(completed_tasks)
-            stats["avg_duration"] = sum(t.duration or 0 for t in completed_tasks) / len(completed_tasks)
+        # 已完成任务的平均等待时间和执行时间
+        completed = self.state_counts[TaskState.COMPLETED]
+        if completed:
+            stats["avg_waiting_time"] = self._completed_wait_total / completed
+            stats["avg_duration"] = self._completed_run_total / completed
 
         return stats
 
-    async def _worker(self) -> None:
-        """任务处理器 (内部使用)"""
-        while not self._shutdown_event.is_set():
-            # 检查是否可以启动新任务
-            if len(self.running_tasks) >= self.max_concurrent:
-                await asyncio.sleep(0.1)
-                continue
+    @property
+    def pending_count(self) -> int:
+        """等待中任务数"""
+        return sum(self.pending_by_priority.values())
 
-            # 获取下一个任务 (按优先级)
-            task_id = self._get_next_task()
-            if task_id is None:
-                await asyncio.sleep(0.1)
-                continue
+    def set_tenant_weight(self, tenant: str, weight: float) -> None:
+        """
+        设置提交方权重 (影响之后入队的任务)
+
+        Args:
+            tenant: 提交方
+            weight: 权重 (必须为正数)
+        """
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        self.tenant_weights[tenant] = weight
+
+    def _can_dispatch(self) -> bool:
+        """是否有待执行任务且有空闲并发槽位 (内部使用)"""
+        return (
+            len(self.running_tasks) < self.max_concurrent
+            and self.pending_count > 0
+        )
 
-            # 启动任务
-            asyncio.create_task(self._run_task(task_id))
+    def _enqueue(self, task: QueueTask) -> None:
+        """计算调度键并入堆 (内部使用)"""
+        now = time.monotonic()
+        weight = self.tenant_weights.get(task.tenant, 1.0)
+
+        start_tag = max(now, self._tenant_finish.get(task.tenant, now))
+        self._tenant_finish[task.tenant] = start_tag + self.fair_share_quantum / weight
+        self._tenant_pending[task.tenant] = self._tenant_pending.get(task.tenant, 0) + 1
+        if len(self._tenant_finish) >= self._tenant_prune_at:
+            self._prune_tenants(now)
+
+        key = start_tag - task.priority.value * self.aging_interval
+        self._seq += 1
+        heapq.heappush(self._heap, (key, self._seq, task.id))
+        self.pending_by_priority[task.priority] += 1
+
+    def _dequeued(self, task: QueueTask) -> None:
+        """任务离开等待队列 (派发或取消) 时更新计数 (内部使用)"""
+        self.pending_by_priority[task.priority] -= 1
+
+        pending = self._tenant_pending.get(task.tenant, 0) - 1
+        if pending > 0:
+            self._tenant_pending[task.tenant] = pending
+            return
+        self._tenant_pending.pop(task.tenant, None)
+        # 完成时间不超过当前时间的提交方与新提交方等价，可以直接删除
+        if self._tenant_finish.get(task.tenant, 0.0) <= time.monotonic():
+            self._tenant_finish.pop(task.tenant, None)
+
+    def _prune_tenants(self, now: float) -> None:
+        """清理没有等待任务且完成时间已过的提交方 (内部使用)"""
+        for tenant, finish in list(self._tenant_finish.items()):
+            if finish <= now and tenant not in self._tenant_pending:
+                del self._tenant_finish[tenant]
+        self._tenant_prune_at = max(64, 2 * len(self._tenant_finish))
+
+    async def _worker(self) -> None:
+        """任务处理器 (内部使用)"""
+        async with self._condition:
+            while True:
+                # 等待可调度的任务或关闭信号
+                await self._condition.wait_for(
+                    lambda: self._shutdown_event.is_set() or self._can_dispatch()
+                )
+                if self._shutdown_event.is_set():
+                    return
+
+                # 获取下一个任务 (按优先级)，在派发时占用并发槽位
+                task_id = self._get_next_task()
+                if task_id is None:
+                    continue
+                task = self.tasks[task_id]
+                self._set_state(task, TaskState.RUNNING)
+                task.started_at = datetime.now()
+                self.wait_time_histogram.record(task.waiting_time)
+                self.running_tasks.add(task_id)
+
+                # 启动任务
+                self._running_handles[task_id] = asyncio.create_task(self._run_task(task_id))
 
     def _get_next_task(self) -> Optional[str]:
-        """获取下一个待执行任务 (按优先级)"""
-        # 按优先级从高到低遍历
-        for priority in sorted(TaskPriority, key=lambda p: p.value, reverse=True):
-            queue = self.queues[priority]
-            if queue:
-                return queue.popleft()
+        """获取下一个待执行任务 (调度键最小者)"""
+        while self._heap:
+            _, _, task_id = heapq.heappop(self._heap)
+            task = self.tasks.get(task_id)
+            if task is not None and task.state == TaskState.PENDING:
+                self._dequeued(task)
+                return task_id
         return None
 
     async def _run_task(self, task_id: str) -> None:
         """执行任务 (内部使用)"""
         task = self.tasks[task_id]
 
-        # 标记为运行中
-        task.state = TaskState.RUNNING
-        task.started_at = datetime.now()
-        self.running_tasks.add(task_id)
-
         try:
             # 执行任务 (带超时)
             if task.timeout:
-                task.result = await asyncio.wait_for(
+                result = await asyncio.wait_for(
                     task.func(*task.args, **task.kwargs),
                     timeout=task.timeout
                 )
             else:
-                task.result = await task.func(*task.args, **task.kwargs)
+                result = await task.func(*task.args, **task.kwargs)
 
-            task.state = TaskState.COMPLETED
+            # 已被 cancel() 标记的任务不再覆盖状态
+            if task.state == TaskState.RUNNING:
+                task.result = result
+                self._set_state(task, TaskState.COMPLETED)
 
         except asyncio.TimeoutError:
-            task.state = TaskState.TIMEOUT
+            self._set_state(task, TaskState.TIMEOUT)
             task.error = TimeoutError(f"Task timeout after {task.timeout}s")
 
         except asyncio.CancelledError:
-            task.state = TaskState.CANCELLED
+            if task.state == TaskState.RUNNING:
+                self._set_state(task, TaskState.CANCELLED)
 
         except Exception as e:
-            task.state = TaskState.FAILED
-            task.error = e
+            if task.state == TaskState.RUNNING:
+                self._set_state(task, TaskState.FAILED)
+                task.error = e
 
         finally:
-            task.completed_at = datetime.now()
-            self.running_tasks.discard(task_id)
+            self._running_handles.pop(task_id, None)
+            if task.completed_at is None:
+                task.completed_at = datetime.now()
+            self._finish_task(task)
+
+            # 释放并发槽位并唤醒 worker
+            async with self._condition:
+                self.running_tasks.discard(task_id)
+                self._condition.notify()
+
+    def _set_state(self, task: QueueTask, state: TaskState) -> None:
+        """状态转换并更新计数 (内部使用)"""
+        self.state_counts[task.state] -= 1
+        self.state_counts[state] += 1
+        task.state = state
+
+    def _finish_task(self, task: QueueTask) -> None:
+        """记录已结束任务的统计并放入有界历史 (内部使用)"""
+        if task.id in self._history:
+            return
+
+        if task.duration is not None:
+            self.run_time_histogram.record(task.duration)
+            if task.state == TaskState.COMPLETED:
+                self._completed_wait_total += task.waiting_time or 0
+                self._completed_run_total += task.duration
+
+        self._history[task.id] = None
+        while len(self._history) > self.max_history:
+            evicted_id, _ = self._history.popitem(last=False)
+            evicted = self.tasks.pop(evicted_id, None)
+            if evicted is None:
+                continue
+            offset = None
+            if self.history_spill_path is not None:
+                offset = self._spill_task(evicted, self.history_spill_path)
+            self._evicted_states[evicted_id] = (evicted.state, offset)
+            if len(self._evicted_states) > self.max_evicted_states:
+                self._evicted_states.popitem(last=False)
+
+        self._mark_done(task)
+
+    def _spill_task(self, task: QueueTask, path: Path) -> Optional[int]:
+        """
+        将被淘汰任务的摘要追加写入磁盘 (内部使用)
+
+        Returns:
+            Optional[int]: 记录在文件中的偏移，写入失败返回 None
+        """
+        record: Dict[str, Any] = {
+            "id": task.id,
+            "name": task.name,
+            "tenant": task.tenant,
+            "priority": task.priority.name,
+            "state": task.state.value,
+            "error": str(task.error) if task.error else None,
+            "created_at": task.created_at.isoformat(),
+            "started_at": task.started_at.isoformat() if task.started_at else None,
+            "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+            "result": task.result,
+        }
+        try:
+            line = json.dumps(record, ensure_ascii=False)
+        except (TypeError, ValueError):
+            # 结果不可 JSON 序列化时不落盘结果
+            record["result"] = None
+            line = json.dumps(record, ensure_ascii=False)
+
+        try:
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write((line + "\n").encode("utf-8"))
+            return offset
+        except OSError:
+            # 历史落盘失败不影响队列运行
+            return None
+
+    @staticmethod
+    def _load_spilled_task(task_id: str, path: Path, offset: int) -> Optional[QueueTask]:
+        """从落盘记录恢复被淘汰的任务，读取失败返回 None (内部使用)"""
+        def parse_time(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                record = json.loads(f.readline())
+            if record.get("id") != task_id:
+                return None
+
+            return QueueTask(
+                id=task_id,
+                name=record["name"],
+                func=_spilled_task_func,
+                args=(),
+                kwargs={},
+                priority=TaskPriority[record["priority"]],
+                state=TaskState(record["state"]),
+                result=record.get("result"),
+                error=Exception(record["error"]) if record.get("error") else None,
+                created_at=datetime.fromisoformat(record["created_at"]),
+                started_at=parse_time(record.get("started_at")),
+                completed_at=parse_time(record.get("completed_at")),
+                tenant=record.get("tenant", "default"),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _mark_done(task: QueueTask) -> None:
+        """通知等待该任务的协程 (内部使用)"""
+        if task.done_future is not None and not task.done_future.done():
+            task.done_future.set_result(None)
 
 
 # 全局队列实例 (可选)
@@ -380,10 +741,69 @@ def get_global_queue(
     return _global_queue
 
 
+async def benchmark_queue(
+    num_tasks: int = 10000,
+    max_concurrent: int = 5
+) -> Dict[str, float]:
+    """
+    队列派发性能基准 (空任务)
+
+    1. 吞吐: 一次性提交 num_tasks 个空任务，统计 tasks/sec
+    2. 延迟: 空闲队列中逐个提交并等待，统计入队→开始执行的延迟分位数
+
+    Args:
+        num_tasks: 任务数 (默认 10000)
+        max_concurrent: 最大并发任务数 (默认 5)
+
+    Returns:
+        Dict[str, float]: 基准结果 (延迟单位: 毫秒)
+    """
+    async def noop() -> None:
+        return None
+
+    def percentile(values: List[float], pct: float) -> float:
+        index = min(len(values) - 1, int(len(values) * pct / 100))
+        return values[index] * 1000
+
+    queue = TaskQueue(max_concurrent=max_concurrent, max_queue_size=num_tasks)
+    await queue.start()
+
+    # 吞吐
+    start = time.perf_counter()
+    task_ids = [await queue.submit(noop) for _ in range(num_tasks)]
+    for task_id in task_ids:
+        await queue.wait_for_task(task_id)
+    elapsed = time.perf_counter() - start
+
+    # 延迟
+    latencies: List[float] = []
+    for _ in range(num_tasks):
+        task = await queue.wait_for_task(await queue.submit(noop))
+        latencies.append(task.waiting_time)
+    latencies.sort()
+
+    await queue.stop()
+
+    return {
+        "num_tasks": num_tasks,
+        "throughput_tasks_per_sec": num_tasks / elapsed,
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p99_ms": percentile(latencies, 99),
+        "latency_max_ms": latencies[-1] * 1000,
+    }
+
+
 # CLI 测试入口
 if __name__ == "__main__":
     import sys
 
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        # python queue.py bench [num_tasks]
+        num = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+        for key, value in asyncio.run(benchmark_queue(num)).items():
+            print(f"  {key}: {value:.3f}")
+        sys.exit(0)
+
     async def example_task(name: str, duration: float) -> str:
         """示例任务"""
         print(f"Task {name} started")
@@ -0,0 +1,287 @@
+"""
+AIFlow Streaming JSON Parser
+增量 JSON 解析 - 边接收模型流式输出边解析
+
+核心功能:
+1. 按块 (chunk) 增量校验 JSON 语法，格式错误时立即报错 (无需等待完整输出)
+2. 指定数组 (如 code_structure.nodes) 中的元素一旦完整即解析并返回
+3. 输入结束后返回完整文档
+"""
+
+import json
+import re
+from typing import Any, Iterable, List, NoReturn, Optional, Tuple
+
+# 已完整解析的数组元素: (数组路径, 元素值)
+StreamItem = Tuple[str, Any]
+
+_WHITESPACE = frozenset(" \t\n\r")
+_SCALAR_START = frozenset("-0123456789tfn")
+_SCALAR_CHARS = frozenset("-+.0123456789eEtrufalsn")
+_ESCAPE_CHARS = frozenset('"\\/bfnrtu')
+_LITERALS = frozenset(("true", "false", "null"))
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?\Z")
+_STRING_SPECIAL_RE = re.compile(r'["\\\x00-\x1f]')
+
+# 解析状态
+_VALUE = "value"  # 期望一个值 (根 / 对象键之后)
+_VALUE_OR_END = "value_or_end"  # 数组开头: 期望值或 ]
+_KEY = "key"  # 对象逗号之后: 期望键
+_KEY_OR_END = "key_or_end"  # 对象开头: 期望键或 }
+_COLON = "colon"  # 对象键之后: 期望 :
+_AFTER_VALUE = "after_value"  # 值之后: 期望 , 或结束符
+_DONE = "done"  # 根值已结束
+
+_VALUE_STATES = frozenset((_VALUE, _VALUE_OR_END))
+
+
+class StreamingJSONError(ValueError):
+    """流式 JSON 格式错误"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at char {position}")
+        self.position = position
+
+
+class _Frame:
+    """容器 (对象/数组) 解析帧"""
+
+    __slots__ = ("kind", "path", "state", "key")
+
+    def __init__(self, kind: str, path: Tuple[str, ...]):
+        self.kind = kind  # "{" 或 "["
+        self.path = path  # 容器路径 (对象键; 数组元素记为 "*")
+        self.state = _KEY_OR_END if kind == "{" else _VALUE_OR_END
+        self.key: Optional[str] = None  # 对象当前键
+
+
+class IncrementalJSONParser:
+    """
+    增量 JSON 解析器
+
+    用法:
+        parser = IncrementalJSONParser(["code_structure.nodes", "code_structure.edges"])
+        async for chunk in stream:
+            for path, item in parser.feed(chunk):
+                ...
+        document = parser.close()
+    """
+
+    def __init__(self, item_paths: Iterable[str] = ()):
+        """
+        初始化解析器
+
+        Args:
+            item_paths: 需要逐个返回元素的数组路径 (以 . 分隔的对象键)
+        """
+        self._item_paths = {tuple(path.split(".")): path for path in item_paths}
+
+        self._chunks: List[str] = []
+        self._position = 0  # 已处理的字符数 (错误定位用)
+        self._stack: List[_Frame] = []
+        self._root_state = _VALUE
+
+        # 字符串 / 标量状态
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._key_chars: List[str] = []
+        self._token: Optional[List[str]] = None
+
+        # 正在捕获的数组元素
+        self._item_depth: Optional[int] = None
+        self._item_path = ""
+        self._item_chunks: List[str] = []
+        self._item_from = 0
+
+    def feed(self, chunk: str) -> List[StreamItem]:
+        """
+        输入一块文本
+
+        Args:
+            chunk: 模型输出片段
+
+        Returns:
+            List[StreamItem]: 本块中完成的数组元素
+
+        Raises:
+            StreamingJSONError: 输出不是合法 JSON
+        """
+        items: List[StreamItem] = []
+        self._chunks.append(chunk)
+        self._item_from = 0
+
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._in_string:
+                i = self._scan_string(chunk, i, items)
+                continue
+
+            c = chunk[i]
+            if self._token is not None:
+                if c in _SCALAR_CHARS:
+                    self._token.append(c)
+                    i += 1
+                    continue
+                # 分隔符结束标量，分隔符本身在下面继续处理
+                self._finish_token(i)
+                self._end_value(items, chunk, i)
+
+            if c not in _WHITESPACE:
+                self._structural(c, chunk, i, items)
+            i += 1
+
+        if self._item_depth is not None:
+            self._item_chunks.append(chunk[self._item_from:])
+        self._position += n
+        return items
+
+    def close(self) -> Any:
+        """
+        输入结束，返回完整文档
+
+        Returns:
+            Any: 解析后的 JSON 文档
+
+        Raises:
+            StreamingJSONError: 输出不完整或不是合法 JSON
+        """
+        if self._token is not None:
+            self._finish_token(0)
+            self._token = None
+        if self._in_string or self._stack or self._root_state != _DONE:
+            raise StreamingJSONError("Unexpected end of JSON output", self._position)
+
+        try:
+            return json.loads("".join(self._chunks))
+        except json.JSONDecodeError as e:
+            raise StreamingJSONError(e.msg, e.pos) from e
+
+    def _scan_string(self, chunk: str, i: int, items: List[StreamItem]) -> int:
+        """扫描字符串内容，返回下一个待处理位置 (内部使用)"""
+        if self._escape:
+            if chunk[i] not in _ESCAPE_CHARS:
+                self._error(f"Invalid escape '\\{chunk[i]}'", i)
+            self._escape = False
+            if self._string_is_key:
+                self._key_chars.append(chunk[i])
+            return i + 1
+
+        match = _STRING_SPECIAL_RE.search(chunk, i)
+        end = match.start() if match else len(chunk)
+        if self._string_is_key:
+            self._key_chars.append(chunk[i:end])
+        if match is None:
+            return end
+
+        c = chunk[end]
+        if c == "\\":
+            self._escape = True
+            if self._string_is_key:
+                self._key_chars.append(c)
+        elif c == '"':
+            self._in_string = False
+            if self._string_is_key:
+                frame = self._stack[-1]
+                try:
+                    frame.key = json.loads('"' + "".join(self._key_chars) + '"')
+                except json.JSONDecodeError as e:
+                    self._error(f"Invalid object key: {e.msg}", end)
+                frame.state = _COLON
+            else:
+                self._end_value(items, chunk, end + 1)
+        else:
+            self._error("Invalid control character in string", end)
+        return end + 1
+
+    def _structural(self, c: str, chunk: str, i: int, items: List[StreamItem]) -> None:
+        """处理字符串和标量之外的字符 (内部使用)"""
+        frame = self._stack[-1] if self._stack else None
+        state = frame.state if frame is not None else self._root_state
+
+        if state in _VALUE_STATES:
+            if c == "]" and state == _VALUE_OR_END:
+                self._stack.pop()
+                self._end_value(items, chunk, i + 1)
+            elif c == "{" or c == "[":
+                self._begin_value(frame, i)
+                if frame is None:
+                    path: Tuple[str, ...] = ()
+                else:
+                    key = frame.key if frame.kind == "{" and frame.key is not None else "*"
+                    path = frame.path + (key,)
+                self._stack.append(_Frame(c, path))
+            elif c == '"':
+                self._begin_value(frame, i)
+                self._in_string = True
+                self._string_is_key = False
+            elif c in _SCALAR_START:
+                self._begin_value(frame, i)
+                self._token = [c]
+            else:
+                self._error(f"Expected value, got {c!r}", i)
+
+        elif state == _KEY or state == _KEY_OR_END:
+            if c == '"':
+                self._in_string = True
+                self._string_is_key = True
+                self._key_chars = []
+            elif c == "}" and state == _KEY_OR_END:
+                self._stack.pop()
+                self._end_value(items, chunk, i + 1)
+            else:
+                self._error(f"Expected object key, got {c!r}", i)
+
+        elif state == _COLON and frame is not None:
+            if c != ":":
+                self._error(f"Expected ':', got {c!r}", i)
+            frame.state = _VALUE
+
+        elif state == _AFTER_VALUE and frame is not None:
+            if c == ",":
+                frame.state = _KEY if frame.kind == "{" else _VALUE
+            elif (c == "}" and frame.kind == "{") or (c == "]" and frame.kind == "["):
+                self._stack.pop()
+                self._end_value(items, chunk, i + 1)
+            else:
+                self._error(f"Expected ',' or closing bracket, got {c!r}", i)
+
+        else:
+            self._error("Extra data after JSON document", i)
+
+    def _begin_value(self, parent: Optional[_Frame], i: int) -> None:
+        """值开始: 更新父容器状态，必要时开始捕获数组元素 (内部使用)"""
+        if parent is None:
+            self._root_state = _DONE
+            return
+
+        parent.state = _AFTER_VALUE
+        if self._item_depth is None and parent.kind == "[" and parent.path in self._item_paths:
+            self._item_depth = len(self._stack)
+            self._item_path = self._item_paths[parent.path]
+            self._item_chunks = []
+            self._item_from = i
+
+    def _end_value(self, items: List[StreamItem], chunk: str, end: int) -> None:
+        """值结束: 如果是正在捕获的数组元素则解析并输出 (内部使用)"""
+        if self._item_depth is None or len(self._stack) != self._item_depth:
+            return
+
+        text = "".join(self._item_chunks) + chunk[self._item_from:end]
+        self._item_depth = None
+        self._item_chunks = []
+        try:
+            items.append((self._item_path, json.loads(text)))
+        except json.JSONDecodeError as e:
+            self._error(f"Invalid item in {self._item_path}: {e.msg}", end)
+
+    def _finish_token(self, i: int) -> None:
+        """校验标量 (数字 / true / false / null) (内部使用)"""
+        token = "".join(self._token or ())
+        self._token = None
+        if token not in _LITERALS and not _NUMBER_RE.match(token):
+            self._error(f"Invalid literal {token!r}", i - len(token))
+
+    def _error(self, message: str, i: int) -> NoReturn:
+        """抛出带位置的格式错误 (内部使用)"""
+        raise StreamingJSONError(message, self._position + i)
@@ -131,7 +131,8 @@ class PromptTemplateManager:
                     f"No latest version for {language}/{stage}"
                 )
 
-        # 查找模板
+        # 查找模板 (registry 中 latest 带 "v" 前缀，模板 version 不带)
+        version = version.lstrip("v")
         templates = stage_info.get("templates", [])
         for template in templates:
             if template["version"] == version:
@@ -8,12 +8,14 @@ Jinja2 模板渲染器 - 渲染 Prompt 模板
 3. 验证输入参数（基于 input_schema）
 4. 处理模板变量和过滤器
 5. 返回渲染后的文本
+6. 拆分为可缓存的共享上下文前缀和阶段专属后缀
 """
 
 import json
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 try:
     from jinja2 import Environment, StrictUndefined, Template, TemplateSyntaxError
@@ -38,9 +40,29 @@ class InputValidationError(Exception):
     pass
 
 
+@dataclass
+class RenderedPrompt:
+    """拆分后的 Prompt: 共享上下文块 (各阶段相同，可缓存) + 阶段专属 Prompt"""
+    context_blocks: List[str]
+    prompt: str
+
+    @property
+    def text(self) -> str:
+        """完整 Prompt 文本 (不支持上下文块时使用)"""
+        return "\n\n".join([*self.context_blocks, self.prompt])
+
+
 class PromptRenderer:
     """Prompt 模板渲染器"""
 
+    # 多个阶段重复使用的大块输入，按此顺序放入共享上下文前缀
+    SHARED_CONTEXT_KEYS = (
+        "file_tree",
+        "source_code_tree",
+        "project_metadata_json",
+        "code_structure_json",
+    )
+
     def __init__(
         self,
         manager: Optional[PromptTemplateManager] = None,
@@ -165,6 +187,49 @@ class PromptRenderer:
         except Exception as e:
             raise RenderError(f"Render failed: {e}") from e
 
+    def render_split(
+        self,
+        language: str,
+        stage: str,
+        input_data: Dict[str, Any],
+        version: Optional[str] = None,
+        validate_input: bool = True
+    ) -> RenderedPrompt:
+        """
+        渲染 Prompt 模板，并把 SHARED_CONTEXT_KEYS 中的输入拆分为共享上下文块
+
+        阶段 Prompt 中这些输入被替换为对上下文块的引用，因此不同阶段的 Prompt
+        共享同一个前缀，可以使用提供商的提示词缓存。
+
+        Args:
+            同 render()
+
+        Returns:
+            RenderedPrompt: 共享上下文块 + 阶段 Prompt
+
+        Raises:
+            同 render()
+        """
+        context_blocks = []
+        stage_input = dict(input_data)
+        for key in self.SHARED_CONTEXT_KEYS:
+            if key not in input_data:
+                continue
+            fence = "json" if key.endswith("_json") else ""
+            context_blocks.append(
+                f"## 共享上下文: {key}\n\n```{fence}\n{input_data[key]}\n```"
+            )
+            stage_input[key] = f"(见前文共享上下文: {key})"
+
+        # 按完整输入验证，按替换后的输入渲染
+        if validate_input:
+            template_data = self.manager.load_template(language, stage, version)
+            if "input_schema" in template_data:
+                self._validate_input(input_data, template_data["input_schema"])
+
+        prompt = self.render(language, stage, stage_input, version, validate_input=False)
+        return RenderedPrompt(context_blocks=context_blocks, prompt=prompt)
+
     def render_by_id(
         self,
         template_id: str,
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from code2flow.engine import _filter_groups_for_subset, write_file
+from code2flow.model import GROUP_TYPE, Call, Edge, Group, Node, Variable
+
+DESCRIPTION = """
+Benchmarks for the code2flow graph model on large synthetic graphs.
+
+    python benchmark.py memory [num_nodes]
+    python benchmark.py trim [num_nodes]
+    python benchmark.py write [num_nodes]
+"""
+
+
+def make_graph(num_nodes, nodes_per_class=10, classes_per_file=10):
+    """
+    Build a synthetic graph shaped like a parsed python project: files of
+    classes of methods, each with a few calls and variables, plus one edge
+    per node.
+
+    :param int num_nodes:
+    :rtype: (list[Group], list[Node], list[Edge])
+    """
+    file_groups = []
+    all_nodes = []
+    nodes_per_file = nodes_per_class * classes_per_file
+    for f in range(0, num_nodes, nodes_per_file):
+        file_group = Group('file%d' % f, GROUP_TYPE.FILE, 'File', ['file%d' % f], 0)
+        file_group.add_node(Node('(global)', [], [], file_group, line_number=0), is_root=True)
+        for c in range(classes_per_file):
+            class_group = Group('Class%d_%d' % (f, c), GROUP_TYPE.CLASS, 'Class',
+                                [], c * 100, parent=file_group)
+            for m in range(nodes_per_class):
+                i = f + c * nodes_per_class + m
+                line = c * 100 + m * 10
+                calls = [Call('method%d' % ((i * 7 + k) % num_nodes), line + k, 'self')
+                         for k in range(3)]
+                variables = [Variable('self', class_group, line),
+                             Variable('var%d' % i, Call('Class%d_0' % f, line + 1), line + 1)]
+                node = Node('method%d' % i, calls, variables, class_group,
+                            line_number=line, is_constructor=(m == 0))
+                class_group.add_node(node)
+                all_nodes.append(node)
+            file_group.add_subgroup(class_group)
+        file_groups.append(file_group)
+
+    edges = [Edge(all_nodes[i], all_nodes[(i * 7 + 1) % len(all_nodes)])
+             for i in range(len(all_nodes))]
+    return file_groups, all_nodes, edges
+
+
+def benchmark_memory(num_nodes=60000):
+    """
+    Print the memory held by a synthetic graph of num_nodes functions
+    :param int num_nodes:
+    :rtype: None
+    """
+    tracemalloc.start()
+    start = time.time()
+    graph = make_graph(num_nodes)
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("%d nodes, %d edges: %.1f MB held (%.0f bytes/node), %.1f MB peak, built in %.2fs" % (
+        len(graph[1]), len(graph[2]), current / 2 ** 20, current / num_nodes,
+        peak / 2 ** 20, elapsed))
+
+
+def benchmark_trim(num_nodes=100000):
+    """
+    Print how long it takes to trim 90% of the nodes from a synthetic graph
+    of num_nodes functions. Run for small classes, where most classes end up
+    empty and get pruned, and for one big class per file.
+    :param int num_nodes:
+    :rtype: None
+    """
+    for nodes_per_class, classes_per_file in ((10, 10), (1000, 1)):
+        file_groups, all_nodes, _ = make_graph(num_nodes, nodes_per_class, classes_per_file)
+        keep = {node for i, node in enumerate(all_nodes) if i % 100 < 10}
+        num_groups = sum(len(g.all_groups()) for g in file_groups)
+        gc.collect()
+        start = time.time()
+        file_groups = _filter_groups_for_subset(keep, file_groups)
+        elapsed = time.time() - start
+        assert sum(len(g.all_nodes()) for g in file_groups) == len(keep)
+        print("%d nodes, %d groups: trimmed to %d nodes, %d groups in %.2fs" % (
+            len(all_nodes), num_groups, len(keep),
+            sum(len(g.all_groups()) for g in file_groups), elapsed))
+
+
+def benchmark_write(num_nodes=100000):
+    """
+    Print the peak memory used while writing a synthetic graph of num_nodes
+    functions as dot and as json. The graph itself is built before tracing
+    starts so only the writer is measured.
+    :param int num_nodes:
+    :rtype: None
+    """
+    file_groups, all_nodes, edges = make_graph(num_nodes)
+    for as_json in (False, True):
+        with open(os.devnull, 'w') as fh:
+            start = time.time()
+            write_file(fh, all_nodes, edges, file_groups, as_json=as_json)
+            elapsed = time.time() - start
+            gc.collect()
+            tracemalloc.start()
+            write_file(fh, all_nodes, edges, file_groups, as_json=as_json)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print("%d nodes, %d edges as %s: %.2f MB peak, written in %.2fs" % (
+            len(all_nodes), len(edges), 'json' if as_json else 'dot',
+            peak / 2 ** 20, elapsed))
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in ('memory', 'trim', 'write'):
+        print(DESCRIPTION)
+        sys.exit(1)
+    if sys.argv[1] == 'memory':
+        benchmark_memory(*map(int, sys.argv[2:3]))
+    if sys.argv[1] == 'trim':
+        benchmark_trim(*map(int, sys.argv[2:3]))
+    if sys.argv[1] == 'write':
+        benchmark_write(*map(int, sys.argv[2:3]))
@@ -1,24 +1,32 @@
 import argparse
 import collections
+import gzip
+import hashlib
 import json
 import logging
 import os
+import pickle
 import subprocess
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from .python import Python
 from .javascript import Javascript
 from .ruby import Ruby
 from .php import PHP
 from .model import (TRUNK_COLOR, LEAF_COLOR, NODE_COLOR, GROUP_TYPE, OWNER_CONST,
-                    Edge, Group, Node, Variable, is_installed, flatten)
+                    Edge, Group, Node, ResolutionIndex, Variable, is_installed, flatten,
+                    PACK_VERSION, assign_ids, pack_file_group, unpack_file_group,
+                    prune_empty_groups, remove_nodes)
 
 VERSION = '2.5.1'
 
 IMAGE_EXTENSIONS = ('png', 'svg')
 TEXT_EXTENSIONS = ('dot', 'gv', 'json')
 VALID_EXTENSIONS = IMAGE_EXTENSIONS + TEXT_EXTENSIONS
+JSON_CHUNK_SIZE = 1000  # nodes / edges serialized per write when streaming json
+GZIP_SUFFIX = '.gz'  # appended to a text extension (e.g. out.json.gz) to gzip the output
 
 DESCRIPTION = "Generate flow charts from your source code. " \
               "See the README at https://github.com/scottrogowski/code2flow."
@@ -47,14 +55,19 @@ LANGUAGES = {
     'php': PHP,
 }
 
+# Pass as the language to parse every file with the backend matching its extension
+ALL_LANGUAGES = 'all'
+
 
 class LanguageParams():
     """
     Shallow structure to make storing language-specific parameters cleaner
     """
-    def __init__(self, source_type='script', ruby_version='27'):
+    def __init__(self, source_type='script', ruby_version='27', parser_daemon=True):
         self.source_type = source_type
         self.ruby_version = ruby_version
+        # Parse js/rb/php files through one long-lived parser process
+        self.parser_daemon = parser_daemon
 
 
 class SubsetParams():
@@ -177,19 +190,9 @@ def _filter_groups_for_subset(new_nodes, file_groups):
     :param file_groups list[Group]:
     :rtype: list[Group]
     """
-    for file_group in file_groups:
-        for node in file_group.all_nodes():
-            if node not in new_nodes:
-                node.remove_from_parent()
-
-    new_file_groups = [g for g in file_groups if g.all_nodes()]
-
-    for file_group in new_file_groups:
-        for group in file_group.all_groups():
-            if not group.all_nodes():
-                group.remove_from_parent()
-
-    return new_file_groups
+    remove_nodes(node for file_group in file_groups
+                 for node in file_group.all_nodes() if node not in new_nodes)
+    return prune_empty_groups(file_groups)
 
 
 def _filter_for_subset(subset_params, all_nodes, edges, file_groups):
@@ -205,7 +208,7 @@ def _filter_for_subset(subset_params, all_nodes, edges, file_groups):
     new_nodes = _filter_nodes_for_subset(subset_params, all_nodes, edges)
     new_edges = _filter_edges_for_subset(new_nodes, edges)
     new_file_groups = _filter_groups_for_subset(new_nodes, file_groups)
-    return new_file_groups, list(new_nodes), new_edges
+    return new_file_groups, [n for n in all_nodes if n in new_nodes], new_edges
 
 
 def generate_json(nodes, edges):
@@ -217,21 +220,64 @@ def generate_json(nodes, edges):
     :param edges list[Edge]: function calls
     :rtype: str
     '''
-    nodes = [n.to_dict() for n in nodes]
-    nodes = {n['uid']: n for n in nodes}
-    edges = [e.to_dict() for e in edges]
+    return ''.join(_iter_json(nodes, edges))
+
+
+def _iter_json(nodes, edges):
+    '''
+    Yield generate_json's output in chunks of JSON_CHUNK_SIZE nodes or edges
+
+    :param nodes list[Node]: functions
+    :param edges list[Edge]: function calls
+    :rtype: Iterator[str]
+    '''
+    yield '{"graph": {"directed": true, "nodes": {'
+    for i in range(0, len(nodes), JSON_CHUNK_SIZE):
+        chunk = [n.to_dict() for n in nodes[i:i + JSON_CHUNK_SIZE]]
+        # strip the braces to splice this chunk into the nodes object
+        yield (', ' if i else '') + json.dumps({n['uid']: n for n in chunk})[1:-1]
+    yield '}, "edges": ['
+    for i in range(0, len(edges), JSON_CHUNK_SIZE):
+        chunk = [e.to_dict() for e in edges[i:i + JSON_CHUNK_SIZE]]
+        yield (', ' if i else '') + json.dumps(chunk)[1:-1]
+    yield ']}}'
+
+
+def _iter_dot(nodes, edges, groups, hide_legend=False, no_grouping=False):
+    '''
+    Yield the dot file one line (or group line) at a time
 
-    return json.dumps({"graph": {
-        "directed": True,
-        "nodes": nodes,
-        "edges": edges,
-    }})
+    :param nodes list[Node]: functions
+    :param edges list[Edge]: function calls
+    :param groups list[Group]: classes and files
+    :param hide_legend bool:
+    :param no_grouping bool:
+    :rtype: Iterator[str]
+    '''
+    splines = "polyline" if len(edges) >= 500 else "ortho"
+
+    yield "digraph G {\n"
+    yield "concentrate=true;\n"
+    yield f'splines="{splines}";\n'
+    yield 'rankdir="LR";\n'
+    if not hide_legend:
+        yield LEGEND
+    for node in nodes:
+        yield node.to_dot() + ';\n'
+    for edge in edges:
+        yield edge.to_dot() + ';\n'
+    if not no_grouping:
+        for group in groups:
+            yield from group.iter_dot()
+    yield '}\n'
 
 
 def write_file(outfile, nodes, edges, groups, hide_legend=False,
                no_grouping=False, as_json=False):
     '''
-    Write a dot file that can be read by graphviz
+    Write a dot file that can be read by graphviz.
+    The output is streamed to outfile so the whole document
+    is never held in memory.
 
     :param outfile File:
     :param nodes list[Node]: functions
@@ -242,27 +288,10 @@ def write_file(outfile, nodes, edges, groups, hide_legend=False,
     '''
 
     if as_json:
-        content = generate_json(nodes, edges)
-        outfile.write(content)
+        outfile.writelines(_iter_json(nodes, edges))
         return
 
-    splines = "polyline" if len(edges) >= 500 else "ortho"
-
-    content = "digraph G {\n"
-    content += "concentrate=true;\n"
-    content += f'splines="{splines}";\n'
-    content += 'rankdir="LR";\n'
-    if not hide_legend:
-        content += LEGEND
-    for node in nodes:
-        content += node.to_dot() + ';\n'
-    for edge in edges:
-        content += edge.to_dot() + ';\n'
-    if not no_grouping:
-        for group in groups:
-            content += group.to_dot()
-    content += '}\n'
-    outfile.write(content)
+    outfile.writelines(_iter_dot(nodes, edges, groups, hide_legend, no_grouping))
 
 
 def determine_language(individual_files):
@@ -286,7 +315,8 @@ def get_sources_and_language(raw_source_paths, language):
     """
     Given a list of files and directories, return just files.
     If we are not passed a language, determine it.
-    Filter out files that are not of that language
+    Filter out files that are not of that language. With ALL_LANGUAGES, keep
+    every file that one of the LANGUAGES can parse.
 
     :param list[str] raw_source_paths: file or directory paths
     :param str|None language: Input language
@@ -311,7 +341,13 @@ def get_sources_and_language(raw_source_paths, language):
 
     sources = set()
     for source, explicity_added in individual_files:
-        if explicity_added or source.endswith('.' + language):
+        if language == ALL_LANGUAGES:
+            if source.rsplit('.', 1)[-1] in LANGUAGES:
+                sources.add(source)
+            else:
+                logging.info("Skipping %r which is not a file of a supported language.",
+                             source)
+        elif explicity_added or source.endswith('.' + language):
             sources.add(source)
         else:
             logging.info("Skipping %r which is not a %s file. "
@@ -363,14 +399,180 @@ def make_file_group(tree, filename, extension):
     return file_group
 
 
-def _find_link_for_call(call, node_a, all_nodes):
+class SymbolIndex():
+    """
+    Lookup tables used to link calls to nodes. Built once, after all
+    groups and nodes are consolidated, so that finding the candidates
+    for a call doesn't require scanning every node.
+    """
+    def __init__(self, all_nodes):
+        # Every node with a given token (for attribute calls like `a.b()`)
+        self.nodes_by_token = collections.defaultdict(list)
+        # Nodes with a given token defined directly on a file (for bare calls)
+        self.file_nodes_by_token = collections.defaultdict(list)
+        # Constructors keyed by the token of their class (for `Cls()`)
+        self.constructors_by_parent_token = collections.defaultdict(list)
+
+        for node in all_nodes:
+            self.nodes_by_token[node.token].append(node)
+            is_file_node = isinstance(node.parent, Group) \
+                and node.parent.group_type == GROUP_TYPE.FILE
+            if is_file_node:
+                self.file_nodes_by_token[node.token].append(node)
+            # A file-level constructor named after its file is already a candidate above
+            if node.is_constructor and not (is_file_node and node.token == node.parent.token):
+                self.constructors_by_parent_token[node.parent.token].append(node)
+
+
+def _parse_file_group(source, extension, skip_parse_errors, lang_params):
+    """
+    Steps 1 & 2 of map_it for a single file. Runs in a worker process when
+    --jobs > 1 so the result is returned in the picklable packed form.
+
+    :param str source:
+    :param str extension:
+    :param bool skip_parse_errors:
+    :param LanguageParams lang_params:
+    :returns: The packed file group or None if the file was skipped
+    :rtype: tuple|None
+    """
+    language = LANGUAGES[extension]
+    try:
+        tree = language.get_tree(source, lang_params)
+    except Exception as ex:
+        if skip_parse_errors:
+            logging.warning("Could not parse %r. (%r) Skipping...", source, ex)
+            return None
+        raise ex
+    return pack_file_group(make_file_group(tree, source, extension))
+
+
+def _parse_packed_file_groups(sources, extensions, skip_parse_errors, lang_params, jobs):
+    """
+    Run steps 1 & 2 for each source, across a process pool when jobs > 1.
+    Results are returned in the order of sources so output does not depend
+    on scheduling.
+
+    :param list[str] sources:
+    :param list[str] extensions: the language extension of each source
+    :param bool skip_parse_errors:
+    :param LanguageParams lang_params:
+    :param int jobs:
+    :returns: The packed file group per source (None for skipped sources)
+    :rtype: list[tuple|None]
+    """
+    n = len(sources)
+    if jobs <= 1 or n <= 1:
+        return [_parse_file_group(source, extension, skip_parse_errors, lang_params)
+                for source, extension in zip(sources, extensions)]
+
+    chunksize = max(1, n // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_parse_file_group, sources, extensions,
+                                 [skip_parse_errors] * n, [lang_params] * n,
+                                 chunksize=chunksize))
+
+
+def _cache_path(cache_dir, source, extension, lang_params):
+    """
+    Where the packed file group for this exact file content is cached.
+    The key covers everything make_file_group depends on: the code2flow
+    and pack format versions, the file path (the file group token), the file content and
+    the language parameters.
+
+    :param str cache_dir:
+    :param str source:
+    :param str extension:
+    :param LanguageParams lang_params:
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    for part in (VERSION, PACK_VERSION, extension, os.path.abspath(source),
+                 lang_params.source_type, lang_params.ruby_version):
+        digest.update(part.encode('utf-8') + b'\0')
+    with open(source, 'rb') as f:
+        digest.update(f.read())
+    key = digest.hexdigest()
+    return os.path.join(cache_dir, key[:2], key + '.pickle')
+
+
+def _load_cached_file_group(path):
+    """
+    :param str path:
+    :returns: The packed file group or None on a cache miss
+    :rtype: tuple|None
+    """
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as ex:
+        logging.debug("Ignoring unreadable cache entry %r (%r).", path, ex)
+        return None
+
+
+def _store_cached_file_group(path, packed):
+    """
+    Atomically write a packed file group to the cache
+    :param str path:
+    :param tuple packed:
+    :rtype: None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(packed, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _make_file_groups(sources, extensions, skip_parse_errors, lang_params, jobs, cache_dir):
+    """
+    Steps 1 & 2 of map_it through the on-disk cache. Only sources whose
+    content changed since they were cached are parsed.
+
+    :param list[str] sources:
+    :param list[str] extensions: the language extension of each source
+    :param bool skip_parse_errors:
+    :param LanguageParams lang_params:
+    :param int jobs:
+    :param str|None cache_dir:
+    :returns: The extension and file group of every source that wasn't skipped
+    :rtype: list[(str, Group)]
+    """
+    packed_groups = {}
+    cache_paths = {}
+    extension_by_source = dict(zip(sources, extensions))
+    if cache_dir:
+        for source, extension in zip(sources, extensions):
+            cache_paths[source] = _cache_path(cache_dir, source, extension, lang_params)
+            packed = _load_cached_file_group(cache_paths[source])
+            if packed is not None:
+                packed_groups[source] = packed
+        logging.info("Loaded %d of %d files from the cache at %r.",
+                     len(packed_groups), len(sources), cache_dir)
+
+    to_parse = [source for source in sources if source not in packed_groups]
+    parsed = _parse_packed_file_groups(to_parse, [extension_by_source[s] for s in to_parse],
+                                       skip_parse_errors, lang_params, jobs)
+    for source, packed in zip(to_parse, parsed):
+        packed_groups[source] = packed
+        if cache_dir and packed is not None:
+            _store_cached_file_group(cache_paths[source], packed)
+
+    return [(extension, unpack_file_group(packed_groups[source]))
+            for source, extension in zip(sources, extensions)
+            if packed_groups[source] is not None]
+
+
+def _find_link_for_call(call, node_a, symbol_index):
     """
     Given a call that happened on a node (node_a), return the node
     that the call links to and the call itself if >1 node matched.
 
     :param call Call:
     :param node_a Node:
-    :param all_nodes list[Node]:
+    :param symbol_index SymbolIndex:
 
     :returns: The node it links to and the call if >1 node matched.
     :rtype: (Node|None, Call|None)
@@ -387,21 +589,15 @@ def _find_link_for_call(call, node_a, all_nodes):
             assert isinstance(var_match, Node)
             return var_match, None
 
-    possible_nodes = []
     if call.is_attr():
-        for node in all_nodes:
-            # checking node.parent != node_a.file_group() prevents self linkage in cases like
-            # function a() {b = Obj(); b.a()}
-            if call.token == node.token and node.parent != node_a.file_group():
-                possible_nodes.append(node)
+        # checking node.parent != node_a.file_group() prevents self linkage in cases like
+        # function a() {b = Obj(); b.a()}
+        file_group = node_a.file_group()
+        possible_nodes = [node for node in symbol_index.nodes_by_token.get(call.token, ())
+                          if node.parent != file_group]
     else:
-        for node in all_nodes:
-            if call.token == node.token \
-               and isinstance(node.parent, Group)  \
-               and node.parent.group_type == GROUP_TYPE.FILE:
-                possible_nodes.append(node)
-            elif call.token == node.parent.token and node.is_constructor:
-                possible_nodes.append(node)
+        possible_nodes = symbol_index.file_nodes_by_token.get(call.token, []) \
+            + symbol_index.constructors_by_parent_token.get(call.token, [])
 
     if len(possible_nodes) == 1:
         return possible_nodes[0], None
@@ -410,79 +606,33 @@ def _find_link_for_call(call, node_a, all_nodes):
     return None, None
 
 
-def _find_links(node_a, all_nodes):
+def _find_links(node_a, symbol_index):
     """
     Iterate through the calls on node_a to find everything the node links to.
     This will return a list of tuples of nodes and calls that were ambiguous.
 
     :param Node node_a:
-    :param list[Node] all_nodes:
-    :param BaseLanguage language:
+    :param SymbolIndex symbol_index:
     :rtype: list[(Node, Call)]
     """
 
     links = []
     for call in node_a.calls:
-        lfc = _find_link_for_call(call, node_a, all_nodes)
+        lfc = _find_link_for_call(call, node_a, symbol_index)
         assert not isinstance(lfc, Group)
         links.append(lfc)
     return list(filter(None, links))
 
 
-def map_it(sources, extension, no_trimming, exclude_namespaces, exclude_functions,
-           include_only_namespaces, include_only_functions,
-           skip_parse_errors, lang_params):
-    '''
-    Given a language implementation and a list of filenames, do these things:
-    1. Read/parse source ASTs
-    2. Find all groups (classes/modules) and nodes (functions) (a lot happens here)
-    3. Trim namespaces / functions that we don't want
-    4. Consolidate groups / nodes given all we know so far
-    5. Attempt to resolve the variables (point them to a node or group)
-    6. Find all calls between all nodes
-    7. Loudly complain about duplicate edges that were skipped
-    8. Trim nodes that didn't connect to anything
-
-    :param list[str] sources:
-    :param str extension:
-    :param bool no_trimming:
-    :param list exclude_namespaces:
-    :param list exclude_functions:
-    :param list include_only_namespaces:
-    :param list include_only_functions:
-    :param bool skip_parse_errors:
-    :param LanguageParams lang_params:
-
-    :rtype: (list[Group], list[Node], list[Edge])
-    '''
-
-    language = LANGUAGES[extension]
-
-    # 0. Assert dependencies
-    language.assert_dependencies()
-
-    # 1. Read/parse source ASTs
-    file_ast_trees = []
-    for source in sources:
-        try:
-            file_ast_trees.append((source, language.get_tree(source, lang_params)))
-        except Exception as ex:
-            if skip_parse_errors:
-                logging.warning("Could not parse %r. (%r) Skipping...", source, ex)
-            else:
-                raise ex
-
-    # 2. Find all groups (classes/modules) and nodes (functions) (a lot happens here)
-    file_groups = []
-    for source, file_ast_tree in file_ast_trees:
-        file_group = make_file_group(file_ast_tree, source, extension)
-        file_groups.append(file_group)
+def _link_file_groups(file_groups):
+    """
+    Steps 4 to 6 of map_it for the file groups of one language. Calls are
+    only ever resolved against functions of the same language.
 
-    # 3. Trim namespaces / functions to exactly what we want
-    if exclude_namespaces or include_only_namespaces:
-        file_groups = _limit_namespaces(file_groups, exclude_namespaces, include_only_namespaces)
-    if exclude_functions or include_only_functions:
-        file_groups = _limit_functions(file_groups, exclude_functions, include_only_functions)
+    :param list[Group] file_groups:
+    :returns: All nodes, the edges found between them and the ambiguous calls
+    :rtype: (list[Node], list[Edge], list[Call])
+    """
 
     # 4. Consolidate structures
     all_subgroups = flatten(g.all_groups() for g in file_groups)
@@ -504,8 +654,9 @@ def map_it(sources, extension, no_trimming, exclude_namespaces, exclude_function
                     node.variables += [Variable(n.token, n, n.line_number) for n in inherit_nodes]
 
     # 5. Attempt to resolve the variables (point them to a node or group)
+    resolution_index = ResolutionIndex(file_groups)
     for node in all_nodes:
-        node.resolve_variables(file_groups)
+        node.resolve_variables(resolution_index)
 
     # Not a step. Just log what we know so far
     logging.info("Found groups %r." % [g.label() for g in all_subgroups])
@@ -516,10 +667,11 @@ def map_it(sources, extension, no_trimming, exclude_namespaces, exclude_function
                                                          flatten(n.variables for n in all_nodes)))))
 
     # 6. Find all calls between all nodes
+    symbol_index = SymbolIndex(all_nodes)
     bad_calls = []
     edges = []
     for node_a in list(all_nodes):
-        links = _find_links(node_a, all_nodes)
+        links = _find_links(node_a, symbol_index)
         for node_b, bad_call in links:
             if bad_call:
                 bad_calls.append(bad_call)
@@ -527,6 +679,99 @@ def map_it(sources, extension, no_trimming, exclude_namespaces, exclude_function
                 continue
             edges.append(Edge(node_a, node_b))
 
+    return all_nodes, edges, bad_calls
+
+
+def map_it(sources, extension, no_trimming, exclude_namespaces, exclude_functions,
+           include_only_namespaces, include_only_functions,
+           skip_parse_errors, lang_params, jobs=1, cache_dir=None):
+    '''
+    Given a language implementation and a list of filenames, do these things:
+    1. Read/parse source ASTs
+    2. Find all groups (classes/modules) and nodes (functions) (a lot happens here)
+    3. Trim namespaces / functions that we don't want
+    4. Consolidate groups / nodes given all we know so far
+    5. Attempt to resolve the variables (point them to a node or group)
+    6. Find all calls between all nodes
+    7. Loudly complain about duplicate edges that were skipped
+    8. Trim nodes that didn't connect to anything
+
+    With extension=ALL_LANGUAGES, every source is parsed by the language of
+    its own extension. Steps 4 to 6 then run separately for each language
+    and the results are merged into one graph.
+
+    :param list[str] sources:
+    :param str extension:
+    :param bool no_trimming:
+    :param list exclude_namespaces:
+    :param list exclude_functions:
+    :param list include_only_namespaces:
+    :param list include_only_functions:
+    :param bool skip_parse_errors:
+    :param LanguageParams lang_params:
+    :param int jobs: number of processes for steps 1 & 2
+    :param str cache_dir: reuse steps 1 & 2 for unchanged files from this directory
+
+    :rtype: (list[Group], list[Node], list[Edge])
+    '''
+
+    if extension == ALL_LANGUAGES:
+        extensions = [source.rsplit('.', 1)[-1] for source in sources]
+    else:
+        extensions = [extension] * len(sources)
+
+    # 0. Assert dependencies
+    for language in set(LANGUAGES[ext] for ext in extensions):
+        language.assert_dependencies()
+
+    # A parser daemon only pays off when there is more than one file to parse
+    if len(sources) < 2 and lang_params.parser_daemon:
+        lang_params = LanguageParams(lang_params.source_type, lang_params.ruby_version,
+                                     parser_daemon=False)
+
+    # 1. Read/parse source ASTs
+    # 2. Find all groups (classes/modules) and nodes (functions) (a lot happens here)
+    if jobs > 1 or cache_dir:
+        parsed_file_groups = _make_file_groups(sources, extensions, skip_parse_errors,
+                                               lang_params, jobs, cache_dir)
+    else:
+        # Build each file group as soon as its AST is parsed so only one AST
+        # is held in memory at a time
+        parsed_file_groups = []
+        for source, ext in zip(sources, extensions):
+            try:
+                file_ast_tree = LANGUAGES[ext].get_tree(source, lang_params)
+            except Exception as ex:
+                if skip_parse_errors:
+                    logging.warning("Could not parse %r. (%r) Skipping...", source, ex)
+                    continue
+                raise ex
+            parsed_file_groups.append((ext, make_file_group(file_ast_tree, source, ext)))
+
+    file_groups = [file_group for _, file_group in parsed_file_groups]
+    file_groups_by_language = collections.defaultdict(list)
+    for ext, file_group in parsed_file_groups:
+        file_groups_by_language[LANGUAGES[ext]].append(file_group)
+
+    assign_ids(file_groups)
+
+    # 3. Trim namespaces / functions to exactly what we want
+    if exclude_namespaces or include_only_namespaces:
+        file_groups = _limit_namespaces(file_groups, exclude_namespaces, include_only_namespaces)
+    if exclude_functions or include_only_functions:
+        file_groups = _limit_functions(file_groups, exclude_functions, include_only_functions)
+
+    # 4. - 6. Consolidate, resolve variables and find calls for each language
+    all_nodes = []
+    edges = []
+    bad_calls = []
+    for language_file_groups in file_groups_by_language.values():
+        language_nodes, language_edges, language_bad_calls = \
+            _link_file_groups(language_file_groups)
+        all_nodes += language_nodes
+        edges += language_edges
+        bad_calls += language_bad_calls
+
     # 7. Loudly complain about duplicate edges that were skipped
     bad_calls_strings = set()
     for bad_call in bad_calls:
@@ -545,17 +790,9 @@ def map_it(sources, extension, no_trimming, exclude_namespaces, exclude_function
         nodes_with_edges.add(edge.node0)
         nodes_with_edges.add(edge.node1)
 
-    for node in all_nodes:
-        if node not in nodes_with_edges:
-            node.remove_from_parent()
-
-    for file_group in file_groups:
-        for group in file_group.all_groups():
-            if not group.all_nodes():
-                group.remove_from_parent()
-
-    file_groups = [g for g in file_groups if g.all_nodes()]
-    all_nodes = list(nodes_with_edges)
+    remove_nodes(node for node in all_nodes if node not in nodes_with_edges)
+    file_groups = prune_empty_groups(file_groups)
+    all_nodes = [node for node in all_nodes if node in nodes_with_edges]
 
     if not all_nodes:
         logging.warning("No functions found! Most likely, your file(s) do not have "
@@ -579,30 +816,28 @@ def _limit_namespaces(file_groups, exclude_namespaces, include_only_namespaces):
     """
 
     removed_namespaces = set()
+    nodes_to_remove = []
 
     for group in list(file_groups):
         if group.token in exclude_namespaces:
-            for node in group.all_nodes():
-                node.remove_from_parent()
+            nodes_to_remove += group.all_nodes()
             removed_namespaces.add(group.token)
         if include_only_namespaces and group.token not in include_only_namespaces:
-            for node in group.nodes:
-                node.remove_from_parent()
+            nodes_to_remove += group.nodes
             removed_namespaces.add(group.token)
 
         for subgroup in group.all_groups():
-            print(subgroup, subgroup.all_parents())
             if subgroup.token in exclude_namespaces:
-                for node in subgroup.all_nodes():
-                    node.remove_from_parent()
+                nodes_to_remove += subgroup.all_nodes()
                 removed_namespaces.add(subgroup.token)
             if include_only_namespaces and \
                subgroup.token not in include_only_namespaces and \
                all(p.token not in include_only_namespaces for p in subgroup.all_parents()):
-                for node in subgroup.nodes:
-                    node.remove_from_parent()
+                nodes_to_remove += subgroup.nodes
                 removed_namespaces.add(group.token)
 
+    remove_nodes(nodes_to_remove)
+
     for namespace in exclude_namespaces:
         if namespace not in removed_namespaces:
             logging.warning(f"Could not exclude namespace '{namespace}' "
@@ -621,14 +856,17 @@ def _limit_functions(file_groups, exclude_functions, include_only_functions):
     """
 
     removed_functions = set()
+    nodes_to_remove = []
 
     for group in list(file_groups):
         for node in group.all_nodes():
             if node.token in exclude_functions or \
                (include_only_functions and node.token not in include_only_functions):
-                node.remove_from_parent()
+                nodes_to_remove.append(node)
                 removed_functions.add(node.token)
 
+    remove_nodes(nodes_to_remove)
+
     for function_name in exclude_functions:
         if function_name not in removed_functions:
             logging.warning(f"Could not exclude function '{function_name}' "
@@ -672,14 +910,17 @@ def code2flow(raw_source_paths, output_file, language=None, hide_legend=True,
               exclude_namespaces=None, exclude_functions=None,
               include_only_namespaces=None, include_only_functions=None,
               no_grouping=False, no_trimming=False, skip_parse_errors=False,
-              lang_params=None, subset_params=None, level=logging.INFO):
+              lang_params=None, subset_params=None, level=logging.INFO, jobs=1,
+              cache_dir=None):
     """
     Top-level function. Generate a diagram based on source code.
     Can generate either a dotfile or an image.
 
     :param list[str] raw_source_paths: file or directory paths
     :param str|file output_file: path to the output file. SVG/PNG will generate an image.
-    :param str language: input language extension
+                                 A text path ending in .gz (e.g. out.gv.gz) is gzipped.
+    :param str language: input language extension or ALL_LANGUAGES to process every
+                         supported file (each with its own language) into one graph
     :param bool hide_legend: Omit the legend from the output
     :param list exclude_namespaces: List of namespaces to exclude
     :param list exclude_functions: List of functions to exclude
@@ -691,6 +932,8 @@ def code2flow(raw_source_paths, output_file, language=None, hide_legend=True,
     :param lang_params LanguageParams: Object to store lang-specific params
     :param subset_params SubsetParams: Object to store subset-specific params
     :param int level: logging level
+    :param int jobs: number of processes used to parse source files
+    :param str cache_dir: directory of the per-file parse cache (None disables it)
     :rtype: None
     """
     start_time = time.time()
@@ -713,11 +956,17 @@ def code2flow(raw_source_paths, output_file, language=None, hide_legend=True,
     sources, language = get_sources_and_language(raw_source_paths, language)
 
     output_ext = None
+    compress = False
     if isinstance(output_file, str):
-        assert '.' in output_file, "Output filename must end in one of: %r." % set(VALID_EXTENSIONS)
-        output_ext = output_file.rsplit('.', 1)[1] or ''
+        compress = output_file.endswith(GZIP_SUFFIX)
+        uncompressed_file = output_file[:-len(GZIP_SUFFIX)] if compress else output_file
+        assert '.' in uncompressed_file, "Output filename must end in one of: %r." % \
+                                         set(VALID_EXTENSIONS)
+        output_ext = uncompressed_file.rsplit('.', 1)[1] or ''
         assert output_ext in VALID_EXTENSIONS, "Output filename must end in one of: %r." % \
                                                set(VALID_EXTENSIONS)
+        assert not (compress and output_ext in IMAGE_EXTENSIONS), \
+            "Only text output can be gzipped. Use one of: %r." % set(TEXT_EXTENSIONS)
 
     final_img_filename = None
     if output_ext and output_ext in IMAGE_EXTENSIONS:
@@ -734,7 +983,8 @@ def code2flow(raw_source_paths, output_file, language=None, hide_legend=True,
     file_groups, all_nodes, edges = map_it(sources, language, no_trimming,
                                            exclude_namespaces, exclude_functions,
                                            include_only_namespaces, include_only_functions,
-                                           skip_parse_errors, lang_params)
+                                           skip_parse_errors, lang_params, jobs,
+                                           cache_dir)
 
     if subset_params:
         logging.info("Filtering into subset...")
@@ -747,7 +997,7 @@ def code2flow(raw_source_paths, output_file, language=None, hide_legend=True,
     logging.info("Generating output file...")
 
     if isinstance(output_file, str):
-        with open(output_file, 'w') as fh:
+        with (gzip.open if compress else open)(output_file, 'wt') as fh:
             as_json = output_ext == 'json'
             write_file(fh, nodes=all_nodes, edges=edges,
                        groups=file_groups, hide_legend=hide_legend,
@@ -782,11 +1032,14 @@ def main(sys_argv=None):
         help='source code file/directory paths.')
     parser.add_argument(
         '--output', '-o', default='out.png',
-        help=f'output file path. Supported types are {VALID_EXTENSIONS}.')
+        help=f'output file path. Supported types are {VALID_EXTENSIONS}. '
+             f'Add {GZIP_SUFFIX} to a text type (e.g. out.json{GZIP_SUFFIX}) to gzip it.')
     parser.add_argument(
-        '--language', choices=['py', 'js', 'rb', 'php'],
+        '--language', choices=['py', 'js', 'rb', 'php', ALL_LANGUAGES],
         help='process this language and ignore all other files.'
-             'If omitted, use the suffix of the first source file.')
+             'If omitted, use the suffix of the first source file. '
+             f'"{ALL_LANGUAGES}" processes every supported file into one graph. '
+             'Calls are only linked between files of the same language.')
     parser.add_argument(
         '--target-function',
         help='output a subset of the graph centered on this function. '
@@ -829,6 +1082,17 @@ def main(sys_argv=None):
         '--ruby-version', default='27',
         help='ruby only. Which ruby version to parse? This is passed directly into ruby-parse. '
              'Use numbers like 25, 27, or 31.')
+    parser.add_argument(
+        '--no-parser-daemon', action='store_true',
+        help='js/rb/php only. Start a new parser process for every file instead of '
+             'streaming all files through one long-lived parser process.')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=1,
+        help='parse source files with this many processes.')
+    parser.add_argument(
+        '--cache-dir',
+        help='cache parsed files in this directory and only re-parse files '
+             'that changed since the last run.')
     parser.add_argument(
         '--quiet', '-q', action='store_true',
         help='suppress most logging')
@@ -853,7 +1117,8 @@ def main(sys_argv=None):
     include_only_namespaces = list(filter(None, (args.include_only_namespaces or "").split(',')))
     include_only_functions = list(filter(None, (args.include_only_functions or "").split(',')))
 
-    lang_params = LanguageParams(args.source_type, args.ruby_version)
+    lang_params = LanguageParams(args.source_type, args.ruby_version,
+                                 parser_daemon=not args.no_parser_daemon)
     subset_params = SubsetParams.generate(args.target_function, args.upstream_depth,
                                           args.downstream_depth)
 
@@ -872,4 +1137,6 @@ def main(sys_argv=None):
         lang_params=lang_params,
         subset_params=subset_params,
         level=level,
+        jobs=args.jobs,
+        cache_dir=args.cache_dir,
     )
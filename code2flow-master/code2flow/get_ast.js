@@ -2,8 +2,26 @@ const fs = require('fs');
 const {Parser} = require("acorn")
 
 const sourceType = process.argv[2]
-const src = fs.readFileSync(process.argv[3], 'utf8')
-const tree = Parser.parse(src, {'locations': true, 'sourceType': sourceType,
-                                'ecmaVersion': '2020'})
 
-process.stdout.write(JSON.stringify(tree))
+function getTree(filename) {
+    const src = fs.readFileSync(filename, 'utf8')
+    return Parser.parse(src, {'locations': true, 'sourceType': sourceType,
+                              'ecmaVersion': '2020'})
+}
+
+if (process.argv[3] === '--batch') {
+    // Daemon mode: one JSON filename per stdin line, one JSON result per stdout line
+    const readline = require('readline')
+    const rl = readline.createInterface({input: process.stdin, terminal: false})
+    rl.on('line', (line) => {
+        let result
+        try {
+            result = {'tree': getTree(JSON.parse(line))}
+        } catch (e) {
+            result = {'error': String(e.message)}
+        }
+        process.stdout.write(JSON.stringify(result) + '\n')
+    })
+} else {
+    process.stdout.write(JSON.stringify(getTree(process.argv[3])))
+}
@@ -5,9 +5,33 @@ use PhpParser\Error;
 use PhpParser\NodeDumper;
 use PhpParser\ParserFactory;
 
-$code = file_get_contents($argv[1]);
 $parser = (new ParserFactory)->create(ParserFactory::PREFER_PHP7);
 
+if ($argv[1] === '--batch') {
+    // Daemon mode: one JSON filename per stdin line, one JSON result per stdout line
+    ini_set('display_errors', 'stderr');
+    while (($line = fgets(STDIN)) !== false) {
+        try {
+            $code = file_get_contents(json_decode($line));
+            if ($code === false) {
+                throw new Exception('Could not read file');
+            }
+            $result = json_encode(['tree' => $parser->parse($code)]);
+            if ($result === false) {
+                throw new Exception(json_last_error_msg());
+            }
+        } catch (PhpParser\Error $e) {
+            $result = json_encode(['error' => 'Parse Error: ' . $e->getMessage()]);
+        } catch (Throwable $e) {
+            $result = json_encode(['error' => $e->getMessage()]);
+        }
+        echo $result, "\n";
+    }
+    exit(0);
+}
+
+$code = file_get_contents($argv[1]);
+
 try {
     $stmts = $parser->parse($code);
     echo json_encode($stmts, JSON_PRETTY_PRINT), "\n";
@@ -0,0 +1,24 @@
+# Daemon mode equivalent of `ruby-parse --emit-json --<version> <file>`:
+# one JSON filename per stdin line, one JSON result per stdout line
+require 'json'
+
+version = ARGV[0] || '27'
+require "parser/ruby#{version}"
+
+parser_class = Parser.const_get("Ruby#{version}")
+Parser::Builders::Default.modernize
+$stdout.sync = true
+
+$stdin.each_line do |line|
+  begin
+    filename = JSON.parse("[#{line}]")[0]
+    parser = parser_class.new
+    parser.diagnostics.all_errors_are_fatal = true
+    parser.diagnostics.ignore_warnings = true
+    ast = parser.parse(Parser::Source::Buffer.new(filename, 1).read)
+    result = { 'tree' => ast && ast.to_sexp_array }
+  rescue Parser::SyntaxError, StandardError => e
+    result = { 'error' => e.message }
+  end
+  puts JSON.generate(result)
+end
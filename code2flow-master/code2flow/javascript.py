@@ -4,7 +4,7 @@ import json
 import subprocess
 
 from .model import (Group, Node, Call, Variable, BaseLanguage,
-                    OWNER_CONST, GROUP_TYPE, is_installed, djoin, flatten)
+                    OWNER_CONST, GROUP_TYPE, ParserDaemon, is_installed, djoin, flatten)
 
 
 def lineno(el):
@@ -268,10 +268,19 @@ class Javascript(BaseLanguage):
         """
         script_loc = os.path.join(os.path.dirname(os.path.realpath(__file__)),
                                   "get_ast.js")
-        cmd = ["node", script_loc, lang_params.source_type, filename]
-        try:
-            output = subprocess.check_output(cmd, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError:
+        response = None
+        if lang_params.parser_daemon:
+            response = ParserDaemon.parse_file(
+                ["node", script_loc, lang_params.source_type, "--batch"], filename)
+        if response is None:
+            cmd = ["node", script_loc, lang_params.source_type, filename]
+            try:
+                output = subprocess.check_output(cmd, stderr=subprocess.PIPE)
+                response = {'tree': json.loads(output)}
+            except subprocess.CalledProcessError:
+                response = {'error': 'acorn exited with an error'}
+
+        if 'error' in response:
             raise AssertionError(
                 "Acorn could not parse file %r. You may have a JS syntax error or "
                 "if this is an es6-style source, you may need to run code2flow "
@@ -279,8 +288,8 @@ class Javascript(BaseLanguage):
                 "For more detail, try running the command "
                 "\n  acorn %s\n"
                 "Warning: Acorn CANNOT parse all javascript files. See their docs. " %
-                (filename, filename)) from None
-        tree = json.loads(output)
+                (filename, filename))
+        tree = response['tree']
         assert isinstance(tree, dict)
         assert tree['type'] == 'Program'
         return tree
@@ -1,5 +1,11 @@
 import abc
+import atexit
+import bisect
+import itertools
+import json
+import logging
 import os
+import subprocess
 
 
 TRUNK_COLOR = '#966F33'
@@ -26,6 +32,24 @@ class Namespace(dict):
 OWNER_CONST = Namespace("UNKNOWN_VAR", "UNKNOWN_MODULE")
 GROUP_TYPE = Namespace("FILE", "CLASS", "NAMESPACE")
 
+# Bumped whenever the Group/Node tree is mutated. Cached scope chains
+# (see Node.get_variables) are only valid for the generation they were built in.
+_tree_generation = 0
+
+
+def _tree_mutated():
+    """
+    Invalidate every cached scope chain and flattened view
+    :rtype: None
+    """
+    global _tree_generation
+    _tree_generation += 1
+
+
+# Source of integer ids for new Nodes / Groups. map_it renumbers the whole
+# graph with assign_ids so output ids are deterministic.
+_id_counter = itertools.count()
+
 
 def is_installed(executable_cmd):
     """
@@ -61,26 +85,140 @@ def flatten(list_of_lists):
     return [el for sublist in list_of_lists for el in sublist]
 
 
-def _resolve_str_variable(variable, file_groups):
+class ParserDaemon():
+    """
+    A long-lived parser process shared by every file of one language.
+    The process reads filenames (one JSON string per line) on stdin and
+    writes one JSON object per line on stdout: {"tree": ...} when the file
+    parsed or {"error": "..."} when it didn't.
+
+    If the daemon can't be started or stops responding, parse_file returns
+    None and the caller falls back to spawning a parser per file.
+    """
+    _daemons = {}
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL)
+
+    @classmethod
+    def parse_file(cls, cmd, filename):
+        """
+        Parse filename with the daemon started from cmd, starting it if needed.
+
+        :param list[str] cmd:
+        :param str filename:
+        :returns: The daemon's response or None if the daemon is unavailable
+        :rtype: dict|None
+        """
+        # Keyed by pid so forked --jobs workers never share a parent's pipes
+        key = (os.getpid(), tuple(cmd))
+        if key not in cls._daemons:
+            try:
+                cls._daemons[key] = cls(cmd)
+            except OSError as ex:
+                logging.debug("Could not start parser daemon %r (%r).", cmd, ex)
+                cls._daemons[key] = None
+        daemon = cls._daemons[key]
+        if not daemon:
+            return None
+
+        response = daemon._request(filename)
+        if response is None:
+            logging.warning("Parser daemon %r stopped responding. "
+                            "Falling back to one parser process per file.", cmd)
+            daemon.close()
+            cls._daemons[key] = None
+        return response
+
+    def _request(self, filename):
+        """
+        Send one filename and read back one response line
+        :param str filename:
+        :rtype: dict|None
+        """
+        try:
+            self.proc.stdin.write(json.dumps(os.path.abspath(filename)).encode() + b'\n')
+            self.proc.stdin.flush()
+            line = self.proc.stdout.readline()
+            response = json.loads(line)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(response, dict) or not ('tree' in response or 'error' in response):
+            return None
+        return response
+
+    def close(self):
+        """
+        Stop the parser process
+        :rtype: None
+        """
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Stop every daemon started by this process
+        :rtype: None
+        """
+        for key, daemon in list(cls._daemons.items()):
+            if daemon and key[0] == os.getpid():
+                daemon.close()
+            del cls._daemons[key]
+
+
+atexit.register(ParserDaemon.close_all)
+
+
+class ResolutionIndex():
+    """
+    Lookup tables used to resolve variables (map_it step 5). Built once,
+    after all file groups are consolidated.
+    """
+    def __init__(self, file_groups):
+        """
+        :param list[Group] file_groups:
+        """
+        # import token -> first node or group that it imports. Files are
+        # scanned in order and, within a file, nodes before groups
+        self.import_token_targets = {}
+        # group token -> last group with that token
+        self.groups_by_token = {}
+
+        for file_group in file_groups:
+            all_groups = file_group.all_groups()
+            for node in file_group.all_nodes():
+                for import_token in node.import_tokens:
+                    self.import_token_targets.setdefault(import_token, node)
+            for group in all_groups:
+                for import_token in group.import_tokens:
+                    self.import_token_targets.setdefault(import_token, group)
+            for group in all_groups:
+                self.groups_by_token[group.token] = group
+
+
+def _resolve_str_variable(variable, resolution_index):
     """
     String variables are when variable.points_to is a string
     This happens ONLY when we have imports that we delayed processing for
 
-    This function looks through all files to see if any particular node matches
-    the variable.points_to string
+    This function looks up whether any node or group across all files is
+    imported by the variable.points_to string
 
     :param Variable variable:
-    :param list[Group] file_groups:
+    :param ResolutionIndex resolution_index:
     :rtype: Node|Group|str
     """
-    for file_group in file_groups:
-        for node in file_group.all_nodes():
-            if any(ot == variable.points_to for ot in node.import_tokens):
-                return node
-        for group in file_group.all_groups():
-            if any(ot == variable.points_to for ot in group.import_tokens):
-                return group
-    return OWNER_CONST.UNKNOWN_MODULE
+    return resolution_index.import_token_targets.get(variable.points_to,
+                                                     OWNER_CONST.UNKNOWN_MODULE)
 
 
 class BaseLanguage(abc.ABC):
@@ -150,6 +288,8 @@ class Variable():
     They may either point to a string or, once resolved, a Group/Node.
     Not all variables can be resolved
     """
+    __slots__ = ('token', 'points_to', 'line_number')
+
     def __init__(self, token, points_to, line_number=None):
         """
         :param str token:
@@ -184,6 +324,8 @@ class Call():
         do_something()
 
     """
+    __slots__ = ('token', 'owner_token', 'line_number', 'definite_constructor')
+
     def __init__(self, token, line_number=None, owner_token=None, definite_constructor=False):
         self.token = token
         self.owner_token = owner_token
@@ -260,6 +402,9 @@ class Call():
 
 
 class Node():
+    __slots__ = ('token', 'line_number', 'calls', '_variables', 'import_tokens', '_parent',
+                 'is_constructor', 'id', 'is_leaf', 'is_trunk', '_scope_cache')
+
     def __init__(self, token, calls, variables, parent, import_tokens=None,
                  line_number=None, is_constructor=False):
         self.token = token
@@ -270,15 +415,41 @@ class Node():
         self.parent = parent
         self.is_constructor = is_constructor
 
-        self.uid = "node_" + os.urandom(4).hex()
+        self.id = next(_id_counter)
 
         # Assume it is a leaf and a trunk. These are modified later
         self.is_leaf = True  # it calls nothing else
         self.is_trunk = True  # nothing calls it
 
+        # (generation, own variables sorted by line, negated line keys, outer-scope variables)
+        self._scope_cache = None
+
     def __repr__(self):
         return f"<Node token={self.token} parent={self.parent}>"
 
+    @property
+    def uid(self):
+        return "node_%x" % self.id
+
+    @property
+    def variables(self):
+        return self._variables
+
+    @variables.setter
+    def variables(self, variables):
+        # Also runs for `node.variables += [...]`
+        self._variables = variables
+        _tree_mutated()
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        self._parent = parent
+        _tree_mutated()
+
     def __lt__(self, other):
             return self.name() < other.name()
 
@@ -353,7 +524,7 @@ class Node():
         Remove this node from it's parent. This effectively deletes the node.
         :rtype: None
         """
-        self.first_group().nodes = [n for n in self.first_group().nodes if n != self]
+        self.first_group().remove_nodes((self,))
 
     def get_variables(self, line_number=None):
         """
@@ -361,31 +532,58 @@ class Node():
         This includes all local variables as-well-as outer-scope variables
         :rtype: list[Variable]
         """
-        if line_number is None:
-            ret = list(self.variables)
+        cache = self._scope_cache
+        if cache is None or cache[0] != _tree_generation:
+            cache = self._scope_cache = self._build_scope_cache()
+        _, own_sorted, keys, outer = cache
+
+        if keys is None:
+            # Some variables have no line number. Not worth caching
+            if line_number is None:
+                ret = list(self.variables)
+            else:
+                ret = list([v for v in self.variables if v.line_number <= line_number])
+            if any(v.line_number for v in ret):
+                ret.sort(key=lambda v: v.line_number, reverse=True)
+        elif line_number is None:
+            ret = list(own_sorted)
         else:
             # TODO variables should be sorted by scope before line_number
-            ret = list([v for v in self.variables if v.line_number <= line_number])
-        if any(v.line_number for v in ret):
-            ret.sort(key=lambda v: v.line_number, reverse=True)
+            # own_sorted is ordered by descending line number so everything
+            # on or before line_number is a suffix of it
+            ret = own_sorted[bisect.bisect_left(keys, -line_number):]
+
+        return ret + outer
+
+    def _build_scope_cache(self):
+        """
+        Sort this node's variables once and collect the variables of every
+        enclosing scope.
+        :rtype: tuple
+        """
+        own_sorted, keys = self.variables, None
+        if all(v.line_number is not None for v in self.variables):
+            own_sorted = sorted(self.variables, key=lambda v: v.line_number, reverse=True)
+            keys = [-v.line_number for v in own_sorted]
 
+        outer = []
         parent = self.parent
         while parent:
-            ret += parent.get_variables()
+            outer += parent.get_variables()
             parent = parent.parent
-        return ret
+        return _tree_generation, own_sorted, keys, outer
 
-    def resolve_variables(self, file_groups):
+    def resolve_variables(self, resolution_index):
         """
         For all variables, attempt to resolve the Node/Group on points_to.
         There is a good chance this will be unsuccessful.
 
-        :param list[Group] file_groups:
+        :param ResolutionIndex resolution_index:
         :rtype: None
         """
         for variable in self.variables:
             if isinstance(variable.points_to, str):
-                variable.points_to = _resolve_str_variable(variable, file_groups)
+                variable.points_to = _resolve_str_variable(variable, resolution_index)
             elif isinstance(variable.points_to, Call):
                 # else, this is a call variable
                 call = variable.points_to
@@ -393,11 +591,10 @@ class Node():
                 if call.is_attr() and not call.definite_constructor:
                     continue
                 # Else, assume the call is a constructor.
-                # iterate through to find the right group
-                for file_group in file_groups:
-                    for group in file_group.all_groups():
-                        if group.token == call.token:
-                            variable.points_to = group
+                # find the right group
+                group = resolution_index.groups_by_token.get(call.token)
+                if group:
+                    variable.points_to = group
             else:
                 assert isinstance(variable.points_to, (Node, Group))
 
@@ -448,6 +645,8 @@ def _wrap_as_variables(sequence):
 
 
 class Edge():
+    __slots__ = ('node0', 'node1')
+
     def __init__(self, node0, node1):
         self.node0 = node0
         self.node1 = node1
@@ -472,7 +671,7 @@ class Edge():
         :rtype: str
         '''
         ret = self.node0.uid + ' -> ' + self.node1.uid
-        source_color = int(self.node0.uid.split("_")[-1], 16) % len(EDGE_COLORS)
+        source_color = self.node0.id % len(EDGE_COLORS)
         ret += f' [color="{EDGE_COLORS[source_color]}" penwidth="2"]'
         return ret
 
@@ -491,6 +690,10 @@ class Group():
     """
     Groups represent namespaces (classes and modules/files)
     """
+    __slots__ = ('token', 'line_number', '_nodes', '_root_node', '_subgroups', '_parent',
+                 'group_type', 'display_type', 'import_tokens', 'inherits', 'id',
+                 '_scope_cache', '_all_nodes_cache', '_all_groups_cache')
+
     def __init__(self, token, group_type, display_type, import_tokens=None,
                  line_number=None, parent=None, inherits=None):
         self.token = token
@@ -505,11 +708,59 @@ class Group():
         self.inherits = inherits or []
         assert group_type in GROUP_TYPE
 
-        self.uid = "cluster_" + os.urandom(4).hex()  # group doesn't work by syntax rules
+        self.id = next(_id_counter)
+
+        # nodes and subgroups are kept as insertion-ordered dicts (values unused)
+        # so removal is O(1). See remove_nodes / prune_empty_groups.
+
+        # (generation, variables) and (generation, flattened list)
+        self._scope_cache = None
+        self._all_nodes_cache = None
+        self._all_groups_cache = None
 
     def __repr__(self):
         return f"<Group token={self.token} type={self.display_type}>"
 
+    @property
+    def uid(self):
+        return "cluster_%x" % self.id  # group doesn't work by syntax rules
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    @nodes.setter
+    def nodes(self, nodes):
+        self._nodes = dict.fromkeys(nodes)
+        _tree_mutated()
+
+    @property
+    def subgroups(self):
+        return list(self._subgroups)
+
+    @subgroups.setter
+    def subgroups(self, subgroups):
+        self._subgroups = dict.fromkeys(subgroups)
+        _tree_mutated()
+
+    @property
+    def root_node(self):
+        return self._root_node
+
+    @root_node.setter
+    def root_node(self, root_node):
+        self._root_node = root_node
+        _tree_mutated()
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        self._parent = parent
+        _tree_mutated()
+
     def __lt__(self, other):
         return self.label() < other.label()
 
@@ -534,7 +785,8 @@ class Group():
         Subgroups are found after initialization. This is how they are added.
         :param sg Group:
         """
-        self.subgroups.append(sg)
+        self._subgroups[sg] = None
+        _tree_mutated()
 
     def add_node(self, node, is_root=False):
         """
@@ -542,7 +794,8 @@ class Group():
         :param node Node:
         :param is_root bool:
         """
-        self.nodes.append(node)
+        self._nodes[node] = None
+        _tree_mutated()
         if is_root:
             self.root_node = node
 
@@ -551,10 +804,13 @@ class Group():
         List of nodes that are part of this group + all subgroups
         :rtype: list[Node]
         """
-        ret = list(self.nodes)
-        for subgroup in self.subgroups:
-            ret += subgroup.all_nodes()
-        return ret
+        cache = self._all_nodes_cache
+        if cache is None or cache[0] != _tree_generation:
+            ret = list(self._nodes)
+            for subgroup in self._subgroups:
+                ret += subgroup.all_nodes()
+            cache = self._all_nodes_cache = (_tree_generation, ret)
+        return list(cache[1])
 
     def get_constructor(self):
         """
@@ -564,7 +820,7 @@ class Group():
         :rtype: Node|None
         """
         assert self.group_type == GROUP_TYPE.CLASS
-        constructors = [n for n in self.nodes if n.is_constructor]
+        constructors = [n for n in self._nodes if n.is_constructor]
         if constructors:
             return constructors[0]
 
@@ -573,10 +829,13 @@ class Group():
         List of groups that are part of this group + all subgroups
         :rtype: list[Group]
         """
-        ret = [self]
-        for subgroup in self.subgroups:
-            ret += subgroup.all_groups()
-        return ret
+        cache = self._all_groups_cache
+        if cache is None or cache[0] != _tree_generation:
+            ret = [self]
+            for subgroup in self._subgroups:
+                ret += subgroup.all_groups()
+            cache = self._all_groups_cache = (_tree_generation, ret)
+        return list(cache[1])
 
     def get_variables(self, line_number=None):
         """
@@ -588,15 +847,18 @@ class Group():
         :rtype: list[Variable]
         """
 
-        if self.root_node:
-            variables = (self.root_node.variables
-                         + _wrap_as_variables(self.subgroups)
-                         + _wrap_as_variables(n for n in self.nodes if n != self.root_node))
-            if any(v.line_number for v in variables):
-                return sorted(variables, key=lambda v: v.line_number, reverse=True)
-            return variables
-        else:
-            return []
+        cache = self._scope_cache
+        if cache is None or cache[0] != _tree_generation:
+            if self.root_node:
+                variables = (self.root_node.variables
+                             + _wrap_as_variables(self._subgroups)
+                             + _wrap_as_variables(n for n in self._nodes if n != self.root_node))
+                if any(v.line_number for v in variables):
+                    variables.sort(key=lambda v: v.line_number, reverse=True)
+            else:
+                variables = []
+            cache = self._scope_cache = (_tree_generation, variables)
+        return list(cache[1])
 
     def remove_from_parent(self):
         """
@@ -604,7 +866,29 @@ class Group():
         :rtype: None
         """
         if self.parent:
-            self.parent.subgroups = [g for g in self.parent.subgroups if g != self]
+            self.parent.remove_subgroups((self,))
+
+    def remove_nodes(self, nodes):
+        """
+        Remove these nodes from this group. Nodes that aren't direct
+        members of this group are ignored.
+        :param nodes iterable[Node]:
+        :rtype: None
+        """
+        for node in nodes:
+            self._nodes.pop(node, None)
+        _tree_mutated()
+
+    def remove_subgroups(self, subgroups):
+        """
+        Remove these subgroups from this group. Groups that aren't direct
+        subgroups of this group are ignored.
+        :param subgroups iterable[Group]:
+        :rtype: None
+        """
+        for subgroup in subgroups:
+            self._subgroups.pop(subgroup, None)
+        _tree_mutated()
 
     def all_parents(self):
         """
@@ -629,22 +913,191 @@ class Group():
         }
         :rtype: str
         """
+        return ''.join(self.iter_dot())
 
-        ret = 'subgraph ' + self.uid + ' {\n'
-        if self.nodes:
-            ret += '    '
-            ret += ' '.join(node.uid for node in self.nodes)
-            ret += ';\n'
+    def iter_dot(self, indent=''):
+        """
+        Same output as to_dot but yielded one line at a time so that
+        large graphs can be streamed to a file.
+        :param str indent: prefix for every line (used for nested subgroups)
+        :rtype: Iterator[str]
+        """
+        yield indent + 'subgraph ' + self.uid + ' {\n'
+        if self._nodes:
+            yield indent + '    ' + ' '.join(node.uid for node in self._nodes) + ';\n'
         attributes = {
             'label': self.label(),
             'name': self.token,
             'style': 'filled',
         }
         for k, v in attributes.items():
-            ret += f'    {k}="{v}";\n'
-        ret += '    graph[style=dotted];\n'
-        for subgroup in self.subgroups:
-            ret += '    ' + ('\n'.join('    ' + ln for ln in
-                                       subgroup.to_dot().split('\n'))).strip() + '\n'
-        ret += '};\n'
-        return ret
+            yield f'{indent}    {k}="{v}";\n'
+        yield indent + '    graph[style=dotted];\n'
+        for subgroup in self._subgroups:
+            yield from subgroup.iter_dot(indent + '    ')
+        yield indent + '};\n'
+
+
+def remove_nodes(nodes):
+    """
+    Remove many nodes from the tree at once. Each removal is O(1) and the
+    tree is only marked as mutated once so this is linear in len(nodes).
+
+    :param nodes iterable[Node]:
+    :rtype: None
+    """
+    for node in nodes:
+        node.first_group()._nodes.pop(node, None)
+    _tree_mutated()
+
+
+def prune_empty_groups(file_groups):
+    """
+    Remove every group which no longer contains any nodes (directly or through
+    its subgroups) in one bottom-up pass.
+
+    :param file_groups list[Group]:
+    :rtype: list[Group]
+    """
+    def prune(group):
+        empty_subgroups = [sg for sg in group._subgroups if prune(sg)]
+        for subgroup in empty_subgroups:
+            del group._subgroups[subgroup]
+        return not group._nodes and not group._subgroups
+
+    ret = [g for g in file_groups if not prune(g)]
+    _tree_mutated()
+    return ret
+
+
+# Bump when the layout produced by pack_file_group changes (invalidates parse caches)
+PACK_VERSION = '2'
+
+
+def _pack_value(value, refs):
+    """
+    Encode a variable target for pack_file_group.
+    Nodes / Groups become indices. Calls become tuples.
+    :param str|Call|Node|Group value:
+    :param dict refs: id(obj) -> ('n'|'g', index)
+    :rtype: tuple
+    """
+    if isinstance(value, (Node, Group)):
+        return refs[id(value)]
+    if isinstance(value, Call):
+        return ('c', value.token, value.line_number, value.owner_token, value.definite_constructor)
+    return ('v', value)
+
+
+def _unpack_value(packed, groups, nodes):
+    """
+    Decode a variable target from _pack_value
+    :param tuple packed:
+    :param list[Group] groups:
+    :param list[Node] nodes:
+    :rtype: str|Call|Node|Group
+    """
+    kind = packed[0]
+    if kind == 'n':
+        return nodes[packed[1]]
+    if kind == 'g':
+        return groups[packed[1]]
+    if kind == 'c':
+        return Call(packed[1], line_number=packed[2], owner_token=packed[3],
+                    definite_constructor=packed[4])
+    return packed[1]
+
+
+def pack_file_group(file_group):
+    """
+    Convert a freshly built file group into plain tuples that can be pickled
+    cheaply and without recursion. Parent back-references and variables that
+    point at other nodes / groups in the file are stored as indices.
+
+    Only valid before variables are resolved across files (map_it step 5)
+    since those would point outside of this file group.
+
+    :param Group file_group:
+    :rtype: tuple
+    """
+    groups = file_group.all_groups()
+    nodes = flatten(g._nodes for g in groups)
+    refs = {id(g): ('g', i) for i, g in enumerate(groups)}
+    refs.update({id(n): ('n', i) for i, n in enumerate(nodes)})
+
+    def ref(obj):
+        return refs[id(obj)] if obj is not None else None
+
+    packed_groups = []
+    for group in groups:
+        assert all(isinstance(i, str) for i in group.inherits)
+        packed_groups.append((
+            group.token, group.group_type, group.display_type, group.import_tokens,
+            group.line_number, ref(group.parent), group.inherits,
+            [refs[id(n)][1] for n in group._nodes], ref(group.root_node),
+            [refs[id(sg)][1] for sg in group._subgroups]))
+
+    packed_nodes = []
+    for node in nodes:
+        packed_nodes.append((
+            node.token, node.line_number, node.import_tokens, ref(node.parent),
+            node.is_constructor, node.is_leaf, node.is_trunk,
+            [_pack_value(c, refs)[1:] for c in node.calls],
+            [(v.token, _pack_value(v.points_to, refs), v.line_number) for v in node.variables]))
+
+    return packed_groups, packed_nodes
+
+
+def unpack_file_group(packed):
+    """
+    Rebuild the file group produced by pack_file_group
+    :param tuple packed:
+    :rtype: Group
+    """
+    packed_groups, packed_nodes = packed
+
+    groups = []
+    for (token, group_type, display_type, import_tokens, line_number,
+         _, inherits, _, _, _) in packed_groups:
+        groups.append(Group(token, group_type, display_type, import_tokens,
+                            line_number, inherits=inherits))
+
+    nodes = []
+    for (token, line_number, import_tokens, _, is_constructor,
+         is_leaf, is_trunk, calls, _) in packed_nodes:
+        node = Node(token, [Call(*c) for c in calls], [], None, import_tokens=import_tokens,
+                    line_number=line_number, is_constructor=is_constructor)
+        node.is_leaf, node.is_trunk = is_leaf, is_trunk
+        nodes.append(node)
+
+    for group, packed_group in zip(groups, packed_groups):
+        parent, node_idxs, root_node, subgroup_idxs = packed_group[5], *packed_group[7:]
+        group.parent = _unpack_value(parent, groups, nodes) if parent else None
+        group.nodes = [nodes[i] for i in node_idxs]
+        group.root_node = _unpack_value(root_node, groups, nodes) if root_node else None
+        group.subgroups = [groups[i] for i in subgroup_idxs]
+
+    for node, packed_node in zip(nodes, packed_nodes):
+        parent, variables = packed_node[3], packed_node[8]
+        node.parent = _unpack_value(parent, groups, nodes) if parent else None
+        node.variables = [Variable(token, _unpack_value(points_to, groups, nodes), line_number)
+                          for token, points_to, line_number in variables]
+
+    return groups[0]
+
+
+def assign_ids(file_groups):
+    """
+    Renumber every group and node in tree order. Ids (and so uids) then
+    only depend on the sources and not on how or where they were parsed
+    (--jobs, the parse cache).
+
+    :param list[Group] file_groups:
+    :rtype: None
+    """
+    counter = itertools.count()
+    for file_group in file_groups:
+        for group in file_group.all_groups():
+            group.id = next(counter)
+        for node in file_group.all_nodes():
+            node.id = next(counter)
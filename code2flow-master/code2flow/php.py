@@ -3,7 +3,7 @@ import os
 import subprocess
 
 from .model import (Group, Node, Call, Variable, BaseLanguage,
-                    OWNER_CONST, GROUP_TYPE, is_installed, flatten, djoin)
+                    OWNER_CONST, GROUP_TYPE, ParserDaemon, is_installed, flatten, djoin)
 
 
 def lineno(tree):
@@ -250,14 +250,22 @@ class PHP(BaseLanguage):
         :rtype: ast
         """
 
-        outp, returncode = run_ast_parser(filename)
-        if returncode:
+        response = None
+        if lang_params.parser_daemon:
+            script_loc = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                      "get_ast.php")
+            response = ParserDaemon.parse_file(["php", script_loc, "--batch"], filename)
+        if response is None:
+            outp, returncode = run_ast_parser(filename)
+            response = {'error': outp} if returncode else {'tree': json.loads(outp)}
+
+        if 'error' in response:
             raise AssertionError(
                 "Could not parse file %r. You may have a syntax error. "
                 "For more detail, try running with `php %s`. " %
                 (filename, filename))
 
-        tree = json.loads(outp)
+        tree = response['tree']
         assert isinstance(tree, list)
         if len(tree) == 1 and tree[0]['nodeType'] == 'Stmt_InlineHTML':
             raise AssertionError("Tried to parse a file that is not likely PHP")
@@ -1,8 +1,9 @@
 import json
+import os
 import subprocess
 
 from .model import (Group, Node, Call, Variable, BaseLanguage,
-                    OWNER_CONST, GROUP_TYPE, is_installed, flatten)
+                    OWNER_CONST, GROUP_TYPE, ParserDaemon, is_installed, flatten)
 
 
 def resolve_owner(owner_el):
@@ -209,16 +210,27 @@ class Ruby(BaseLanguage):
         :param lang_params LanguageParams:
         :rtype: ast
         """
-        version_flag = "--" + lang_params.ruby_version
-        cmd = ["ruby-parse", "--emit-json", version_flag, filename]
-        output = subprocess.check_output(cmd, stderr=subprocess.PIPE)
-        try:
-            tree = json.loads(output)
-        except json.decoder.JSONDecodeError:
+        response = None
+        if lang_params.parser_daemon:
+            script_loc = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                      "get_ast.rb")
+            response = ParserDaemon.parse_file(
+                ["ruby", script_loc, lang_params.ruby_version], filename)
+        if response is None:
+            version_flag = "--" + lang_params.ruby_version
+            cmd = ["ruby-parse", "--emit-json", version_flag, filename]
+            output = subprocess.check_output(cmd, stderr=subprocess.PIPE)
+            try:
+                response = {'tree': json.loads(output)}
+            except json.decoder.JSONDecodeError:
+                response = {'error': 'ruby-parse output was not json'}
+
+        if 'error' in response or response['tree'] is None:
             raise AssertionError(
                 "Ruby-parse could not parse file %r. You may have a syntax error. "
                 "For more detail, try running the command `ruby-parse %s`. " %
-                (filename, filename)) from None
+                (filename, filename))
+        tree = response['tree']
         assert isinstance(tree, list)
 
         if tree[0] not in ('module', 'begin'):
@@ -1,3 +1,4 @@
+import gzip
 import json
 import locale
 import logging
@@ -103,6 +104,73 @@ def test_json():
     assert len(set(n['target'] for n in jobj['graph']['edges'])) == 3
 
 
+def test_gzip():
+    for ext in ('json', 'gv'):
+        code2flow('test_code/py/simple_b', output_file='/tmp/code2flow/out.' + ext)
+        code2flow('test_code/py/simple_b', output_file='/tmp/code2flow/out.%s.gz' % ext)
+        with open('/tmp/code2flow/out.' + ext) as f, \
+             gzip.open('/tmp/code2flow/out.%s.gz' % ext, 'rt') as gz:
+            assert f.read() == gz.read()
+
+    with pytest.raises(AssertionError):
+        code2flow('test_code/py/simple_b', output_file='/tmp/code2flow/out.png.gz')
+
+
+def test_jobs():
+    def graph(jobs):
+        code2flow('test_code/py/pytz',
+                  output_file='/tmp/code2flow/out.json',
+                  jobs=jobs)
+        with open('/tmp/code2flow/out.json') as f:
+            return json.loads(f.read())['graph']
+
+    # Node uids are deterministic so the whole graph must match
+    assert graph(jobs=1) == graph(jobs=2)
+
+
+def test_cache_dir():
+    src_dir = '/tmp/code2flow/cache_src'
+    cache_dir = '/tmp/code2flow/cache'
+    shutil.rmtree(src_dir, ignore_errors=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.mkdir(src_dir)
+    shutil.copy('test_code/py/two_file_simple/file_a.py', src_dir)
+    shutil.copy('test_code/py/two_file_simple/file_b.py', src_dir)
+
+    def node_names():
+        code2flow(src_dir, output_file='/tmp/code2flow/out.json', cache_dir=cache_dir)
+        with open('/tmp/code2flow/out.json') as f:
+            return sorted(n['name'] for n in json.loads(f.read())['graph']['nodes'].values())
+
+    expected = ['file_a::(global)', 'file_a::a', 'file_b::b']
+    assert node_names() == expected
+    cached = [f for _, _, files in os.walk(cache_dir) for f in files]
+    assert len(cached) == 2
+    assert node_names() == expected
+
+    # A changed file is re-parsed
+    with open(os.path.join(src_dir, 'file_b.py'), 'a') as f:
+        f.write('\n\ndef d():\n    c()\n')
+    assert node_names() == expected + ['file_b::c', 'file_b::d']
+
+
+def test_all_languages():
+    # Both directories define a() and b(). Calls must only link within a language.
+    code2flow(['test_code/py/two_file_simple', 'test_code/js/simple_b_js'],
+              output_file='/tmp/code2flow/out.json',
+              language='all')
+    with open('/tmp/code2flow/out.json') as f:
+        graph = json.loads(f.read())['graph']
+    names = {uid: n['name'] for uid, n in graph['nodes'].items()}
+    assert sorted(names.values()) == [
+        'file_a::(global)', 'file_a::a', 'file_b::b',
+        'simple_b::(global)', 'simple_b::C.d', 'simple_b::a', 'simple_b::b']
+    assert sorted((names[e['source']], names[e['target']]) for e in graph['edges']) == [
+        ('file_a::(global)', 'file_a::a'), ('file_a::a', 'file_b::b'),
+        ('simple_b::(global)', 'simple_b::C.d'), ('simple_b::C.d', 'simple_b::a'),
+        ('simple_b::a', 'simple_b::b'), ('simple_b::b', 'simple_b::a')]
+
+
 def test_weird_encoding():
     """
     To address https://github.com/scottrogowski/code2flow/issues/28